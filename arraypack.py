@@ -0,0 +1,453 @@
+# a self-describing, compressed file format for the typed arrays of arrays.py
+
+# floats.tofile(fp) in arrays.py writes the raw machine bytes of the array and nothing else: to read the file back you
+# must already know the typecode, the number of items and the byte order of the machine that wrote it, and every double
+# costs 8 bytes on disk whatever its value.
+
+# an arraypack file starts with a small header that records all of that, plus the codec used for the data:
+#     magic b'APK1' | typecode | byte order (b'<' or b'>') | chunk (items per block) | length | codec name
+# followed by the blocks. Each block holds up to `chunk` items, is encoded on its own, and is prefixed by its item
+# count and its size in bytes, so a reader can stream through the blocks one at a time; an empty block marks the
+# end. After that comes an index with the offset of every block, and a fixed-size trailer pointing at the index, so
+# block(i) can seek straight to any block without reading the ones before it.
+
+# a codec is a chain of stages separated by '+', i.e. 'delta+zlib'. The first stage turns an array into bytes:
+#     raw     the machine bytes, as tofile writes them
+#     f32     doubles downcast to 4-byte floats: half the size, about 7 significant digits kept (lossy)
+#     delta   integers only: the difference from the previous item, zigzag-mapped to an unsigned number (0, -1, 1,
+#             -2, ... become 0, 1, 2, 3, ...) and written as a varint: 7 bits per byte, high bit set on all but the
+#             last byte. A slowly changing sensor reading moves by a few units per sample, so most items take 1 byte
+# and the following stages compress bytes: zlib (fast) or lzma (smaller, slower). A codec that does not start with an
+# array stage starts with raw, so 'zlib' means 'raw+zlib'.
+
+"""
+    >>> import io
+    >>> from array import array
+    >>> readings = array('h', [1000, 1002, 1001, 1001, 999, 1003] * 1000)
+    >>> fp = io.BytesIO()
+    >>> with Writer(fp, 'h', codec='delta+zlib', chunk=1024) as writer:
+    ...     writer.write(readings)
+    >>> len(fp.getvalue()) < len(readings) * readings.itemsize // 10
+    True
+    >>> reader = Reader(io.BytesIO(fp.getvalue()))
+    >>> reader.typecode, reader.codec, len(reader), reader.nblocks()
+    ('h', 'delta+zlib', 6000, 6)
+    >>> reader.block(3)[:4], reader[5999]
+    (array('h', [1000, 1002, 1001, 1001]), 1003)
+    >>> reader.read() == readings
+    True
+
+"""
+
+import struct
+import sys
+from array import array
+
+MAGIC = b'APK1'
+END_MAGIC = b'APKX'
+
+# magic, typecode, byte order, length of the codec name, items per block, total items; the codec name follows
+HEADER = struct.Struct('<4sccBIQ')
+# item count and payload size of a block
+BLOCK = struct.Struct('<II')
+# index offset, number of blocks, total items, end magic
+TRAILER = struct.Struct('<QQQ4s')
+
+# the length field in the header, patched when the writer is closed
+_LENGTH_OFFSET = HEADER.size - 8
+# written in the header when the output could not be patched; the trailer still has the real length
+UNKNOWN = 2**64 - 1
+
+NATIVE_ORDER = b'<' if sys.byteorder == 'little' else b'>'
+INTEGER_TYPECODES = 'bBhHiIlLqQ'
+
+
+# the data is not an arraypack file, or it is truncated or corrupt
+class FormatError(ValueError):
+    pass
+
+
+# array stages: encode(chunk) -> bytes, decode(data, count, typecode, byteorder) -> array
+
+def _raw_encode(chunk):
+    return chunk.tobytes()
+
+
+def _raw_decode(data, count, typecode, byteorder):
+    values = array(typecode)
+    values.frombytes(data)
+    if byteorder != NATIVE_ORDER:
+        values.byteswap()
+    return values
+
+
+def _f32_encode(chunk):
+    return array('f', chunk).tobytes()
+
+
+def _f32_decode(data, count, typecode, byteorder):
+    return array(typecode, _raw_decode(data, count, 'f', byteorder))
+
+
+def _delta_encode(chunk):
+    # NumPy does the arithmetic in int64, which holds any difference between two items of 4 bytes or less
+    if chunk.itemsize <= 4:
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+        else:
+            return _delta_encode_numpy(np, chunk)
+    out = bytearray()
+    previous = 0
+    for value in chunk:
+        delta = value - previous
+        previous = value
+        number = delta * 2 if delta >= 0 else -delta * 2 - 1
+        while number > 0x7F:
+            out.append(number & 0x7F | 0x80)
+            number >>= 7
+        out.append(number)
+    return bytes(out)
+
+
+def _delta_decode(data, count, typecode, byteorder):
+    if array(typecode).itemsize <= 4:
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+        else:
+            return _delta_decode_numpy(np, data, typecode)
+    values = array(typecode)
+    previous = number = shift = 0
+    for byte in data:
+        number |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += (number >> 1) ^ -(number & 1)
+        values.append(previous)
+        number = shift = 0
+    return values
+
+
+def _delta_encode_numpy(np, chunk):
+    values = np.frombuffer(chunk, dtype=chunk.typecode).astype(np.int64)
+    deltas = np.diff(values, prepend=0)
+    numbers = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+    # bytes per number: one per started group of 7 bits
+    sizes = np.ones(len(numbers), dtype=np.int64)
+    rest = numbers >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+    starts = np.cumsum(sizes) - sizes
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    for k in range(int(sizes.max())):
+        has = sizes > k
+        group = (numbers[has] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (sizes[has] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + k] = group | more
+    return out.tobytes()
+
+
+def _delta_decode_numpy(np, data, typecode):
+    octets = np.frombuffer(data, dtype=np.uint8)
+    last = (octets & 0x80) == 0
+    starts = np.flatnonzero(np.concatenate(([True], last[:-1])))
+    # the position of every byte within its varint, which gives its shift
+    number_of = np.cumsum(last) - last
+    positions = np.arange(len(octets)) - starts[number_of]
+    groups = (octets & 0x7F).astype(np.uint64) << (7 * positions).astype(np.uint64)
+    numbers = np.add.reduceat(groups, starts)
+    deltas = (numbers >> np.uint64(1)).astype(np.int64) ^ -(numbers & np.uint64(1)).astype(np.int64)
+    return array(typecode, np.cumsum(deltas).astype(typecode).tobytes())
+
+
+ARRAY_CODECS = {
+    'raw': (_raw_encode, _raw_decode),
+    'f32': (_f32_encode, _f32_decode),
+    'delta': (_delta_encode, _delta_decode),
+}
+
+
+# byte stages: compress(data, level) -> bytes, decompress(data) -> bytes. The modules are imported on first use
+
+def _zlib_compress(data, level):
+    import zlib
+    return zlib.compress(data, 6 if level is None else level)
+
+
+def _zlib_decompress(data):
+    import zlib
+    return zlib.decompress(data)
+
+
+# raw LZMA2 streams: the .xz container would add about 60 bytes of headers and checksums to every block
+def _lzma_compress(data, level):
+    import lzma
+    filters = [{'id': lzma.FILTER_LZMA2, 'preset': 6 if level is None else level}]
+    return lzma.compress(data, format=lzma.FORMAT_RAW, filters=filters)
+
+
+def _lzma_decompress(data):
+    import lzma
+    return lzma.decompress(data, format=lzma.FORMAT_RAW, filters=[{'id': lzma.FILTER_LZMA2}])
+
+
+BYTE_CODECS = {
+    'zlib': (_zlib_compress, _zlib_decompress),
+    'lzma': (_lzma_compress, _lzma_decompress),
+}
+
+
+# 'zlib' -> ['raw', 'zlib']; checks that every stage exists and suits the typecode
+def parse_codec(codec, typecode):
+    stages = codec.split('+')
+    if stages[0] not in ARRAY_CODECS:
+        stages.insert(0, 'raw')
+    unknown = [stage for stage in stages[1:] if stage not in BYTE_CODECS]
+    if unknown:
+        raise ValueError(f'unknown codec stage {unknown[0]!r} in {codec!r}')
+    if stages[0] == 'delta' and typecode not in INTEGER_TYPECODES:
+        raise ValueError(f'delta needs an integer typecode, not {typecode!r}')
+    if stages[0] == 'f32' and typecode not in 'fd':
+        raise ValueError(f'f32 needs a float typecode, not {typecode!r}')
+    return stages
+
+
+def encode_block(chunk, stages, level=None):
+    data = ARRAY_CODECS[stages[0]][0](chunk)
+    for stage in stages[1:]:
+        data = BYTE_CODECS[stage][0](data, level)
+    return data
+
+
+def decode_block(data, count, typecode, stages, byteorder=NATIVE_ORDER):
+    for stage in reversed(stages[1:]):
+        data = BYTE_CODECS[stage][1](data)
+    values = ARRAY_CODECS[stages[0]][1](data, count, typecode, byteorder)
+    if len(values) != count:
+        raise FormatError(f'block decoded to {len(values)} items, expected {count}')
+    return values
+
+
+# streams items into an arraypack file, one encoded block per `chunk` items
+class Writer:
+
+    def __init__(self, fp, typecode, codec='zlib', chunk=2**16, level=None):
+        self._fp = fp
+        self.typecode = typecode
+        self.codec = codec
+        self.chunk = chunk
+        self.level = level
+        self._stages = parse_codec(codec, typecode)
+        self._pending = array(typecode)
+        self._offsets = array('Q')
+        self._length = 0
+        name = codec.encode('ascii')
+        self._position = self._write(HEADER.pack(MAGIC, typecode.encode('ascii'), NATIVE_ORDER, len(name), chunk,
+                                                 UNKNOWN) + name)
+        self._start = fp.tell() - self._position if fp.seekable() else None
+
+    def _write(self, data):
+        self._fp.write(data)
+        return len(data)
+
+    # full blocks are encoded straight from slices of values; only the items that do not fill a block are kept in
+    # _pending, to be topped up by the next write. Deleting each block from the front of one big buffer instead would
+    # shift the rest of it every time, which makes a single large write quadratic
+    def write(self, values):
+        if not (isinstance(values, array) and values.typecode == self.typecode):
+            values = array(self.typecode, values)
+        chunk, start = self.chunk, 0
+        if self._pending:
+            start = chunk - len(self._pending)
+            self._pending.extend(values[:start])
+            if len(self._pending) < chunk:
+                return
+            self._flush(self._pending)
+            self._pending = array(self.typecode)
+        while start + chunk <= len(values):
+            self._flush(values[start:start + chunk])
+            start += chunk
+        self._pending.extend(values[start:])
+
+    def _flush(self, chunk):
+        data = encode_block(chunk, self._stages, self.level)
+        self._offsets.append(self._position)
+        self._position += self._write(BLOCK.pack(len(chunk), len(data)) + data)
+        self._length += len(chunk)
+
+    def close(self):
+        if self._offsets is None:
+            return
+        if self._pending:
+            self._flush(self._pending)
+            self._pending = array(self.typecode)
+        index = self._offsets
+        if sys.byteorder != 'little':
+            index.byteswap()
+        index_offset = self._position + self._write(BLOCK.pack(0, 0))
+        self._write(index.tobytes())
+        self._write(TRAILER.pack(index_offset, len(index), self._length, END_MAGIC))
+        if self._start is not None:
+            end = self._fp.tell()
+            self._fp.seek(self._start + _LENGTH_OFFSET)
+            self._fp.write(struct.pack('<Q', self._length))
+            self._fp.seek(end)
+        self._offsets = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# reads an arraypack file: block by block from the start, or any block through the index
+class Reader:
+
+    def __init__(self, fp):
+        self._fp = fp
+        header = fp.read(HEADER.size)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise FormatError('not an arraypack file')
+        _, typecode, self.byteorder, name_length, self.chunk, self._length = HEADER.unpack(header)
+        self.typecode = typecode.decode('ascii')
+        self.codec = fp.read(name_length).decode('ascii')
+        self._stages = parse_codec(self.codec, self.typecode)
+        self._start = fp.tell() - HEADER.size - name_length if fp.seekable() else None
+        self._index = None
+
+    # the block offsets from the trailer, read on first use: streaming through blocks() never needs them
+    def _load_index(self):
+        if self._index is None:
+            if self._start is None:
+                raise FormatError('random access needs a seekable file')
+            self._fp.seek(-TRAILER.size, 2)
+            index_offset, nblocks, length, end_magic = TRAILER.unpack(self._fp.read(TRAILER.size))
+            if end_magic != END_MAGIC:
+                raise FormatError('missing trailer: the file is truncated or was not closed')
+            self._fp.seek(self._start + index_offset)
+            index = array('Q')
+            index.frombytes(self._fp.read(nblocks * index.itemsize))
+            if sys.byteorder != 'little':
+                index.byteswap()
+            self._index, self._length = index, length
+        return self._index
+
+    def __len__(self):
+        if self._length == UNKNOWN:
+            self._load_index()
+        return self._length
+
+    def nblocks(self):
+        return len(self._load_index())
+
+    def _read_block(self):
+        count, size = BLOCK.unpack(self._fp.read(BLOCK.size))
+        if not count:
+            return None
+        data = self._fp.read(size)
+        if len(data) != size:
+            raise FormatError('truncated block')
+        return decode_block(data, count, self.typecode, self._stages, self.byteorder)
+
+    def block(self, i):
+        offset = self._load_index()[i]
+        self._fp.seek(self._start + offset)
+        return self._read_block()
+
+    # every block is written full except the last, so item i is in block i // chunk
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('arraypack index out of range')
+        return self.block(i // self.chunk)[i % self.chunk]
+
+    # the blocks in order, reading the file sequentially: works on pipes and sockets too, with one block in memory
+    def blocks(self):
+        if self._start is not None:
+            self._fp.seek(self._start + HEADER.size + len(self.codec))
+        while (values := self._read_block()) is not None:
+            yield values
+
+    def __iter__(self):
+        for values in self.blocks():
+            yield from values
+
+    def read(self):
+        values = array(self.typecode)
+        for block in self.blocks():
+            values.extend(block)
+        return values
+
+    def close(self):
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def dump(values, path, codec='zlib', chunk=2**16, level=None):
+    with open(path, 'wb') as fp, Writer(fp, values.typecode, codec, chunk, level) as writer:
+        writer.write(values)
+
+
+def load(path):
+    with open(path, 'rb') as fp:
+        return Reader(fp).read()
+
+
+def benchmark(count=10**6, path='readings.apk'):
+    import os
+    import random
+    from time import perf_counter
+
+    # a slowly changing sensor reading: a random walk with small steps, stored as 16-bit integers
+    random.seed(0)
+    level, readings = 20_000, array('h')
+    for _ in range(count):
+        level += random.choice((-2, -1, 0, 0, 0, 1, 2))
+        readings.append(level)
+    floats = array('d', (value / 100 for value in readings))
+
+    raw_size = len(readings) * readings.itemsize
+    print(f'{count:,} readings: raw {raw_size:,} bytes as {readings.typecode!r}, '
+          f'{len(floats) * floats.itemsize:,} bytes as {floats.typecode!r}')
+    for values, codec in [(readings, 'raw'), (readings, 'zlib'), (readings, 'lzma'), (readings, 'delta'),
+                          (readings, 'delta+zlib'), (readings, 'delta+lzma'), (floats, 'zlib'), (floats, 'f32'),
+                          (floats, 'f32+zlib')]:
+        t0 = perf_counter()
+        dump(values, path, codec)
+        encoding = perf_counter() - t0
+        t0 = perf_counter()
+        loaded = load(path)
+        decoding = perf_counter() - t0
+        size = os.path.getsize(path)
+        exact = 'exact' if loaded == values else 'lossy'
+        print(f'{values.typecode!r} {codec:12} {size:>10,} bytes  {len(values) * values.itemsize / size:6.1f}x  '
+              f'encode {encoding:6.3f}s  decode {decoding:6.3f}s  {exact}')
+    os.remove(path)
+
+
+def main():
+    import os
+
+    readings = array('h', [1000, 1002, 1001, 1001, 999, 1003])
+    dump(readings, 'readings.apk', codec='delta')
+    with open('readings.apk', 'rb') as fp:
+        reader = Reader(fp)
+        print(reader.typecode, reader.byteorder, reader.codec, len(reader), reader.read())
+    os.remove('readings.apk')
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -6,9 +6,11 @@
 # bisect_right returns an insertion point after the existing item, and bisect_left returns the position
 # of the existing item, so insertion would occur before it. This makes no difference for types such as int.
 
+import array
 import bisect
 import sys
-import random
+
+from instrument import section
 
 HAYSTACK = [1, 4, 5, 6, 8, 12, 15, 20, 21, 23, 23, 26, 29, 30]
 NEEDLES = [0, 1, 2, 5, 8, 10, 22, 23, 29, 30, 31]
@@ -34,20 +36,103 @@ def grade(score):
     return grades[i]
 
 
-# this is amazing how this can be done on one line
-scores = [grade(score) for score in [55, 60, 65, 70, 75, 80, 85, 90, 95]]
-print(scores)
+# grading in bulk: grade_many takes a list, an array, a numpy array or any buffer of scores and returns one grade
+# letter per score as bytes, i.e. grade_many([55, 95]) == b'FA'. The letters are computed from the same breakpoints
+# and grades as grade, so the two always agree.
+
+# integer scores that fit in a byte (0..255, which covers 0..100) are graded with a 256-entry table: bytes.translate
+# for bytes, numpy's take for wider integers, each a single C loop. Anything else goes through numpy.searchsorted, the
+# vectorized equivalent of bisect.bisect (side='right'), or a plain map over grade when numpy is not installed.
+
+# the table is built once and kept with the breakpoints and grades it was built from; if either is changed, the next
+# call builds a new one
+_table_cache = (None, None)
+
+
+def _grade_table():
+    global _table_cache
+    key = (tuple(breakpoints), grades)
+    cached_key, table = _table_cache
+    if cached_key != key:
+        table = bytes(ord(grade(score)) for score in range(256))
+        _table_cache = (key, table)
+    return table
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
 
-# bisect can also be used for inserting items in a sorted sequence without disrupting the order of the sequence
-# insort(seq, item) inserts item into seq so as to keep seq in ascending order
+def grade_many(scores):
+    try:
+        memv = memoryview(scores)
+    except TypeError:
+        # a list or other iterable: pack it, as integers if possible, else as doubles. Ints too large even for a
+        # double are graded one by one
+        scores = list(scores)
+        for typecode in 'qd':
+            try:
+                memv = memoryview(array.array(typecode, scores))
+                break
+            except (TypeError, OverflowError):
+                pass
+        else:
+            return ''.join(map(grade, scores)).encode('ascii')
+    if memv.format in ('B', 'c'):
+        octets = memv.cast('B').tobytes()
+        return octets.translate(_grade_table())
+    np = _numpy()
+    if memv.format in tuple('bhilqBHILQ') and memv.ndim == 1:
+        if np is not None:
+            values = np.asarray(memv)
+            if not values.size:
+                return b''
+            # a range check, then one gather from the table
+            if values.min() >= 0 and values.max() < 256:
+                return np.frombuffer(_grade_table(), dtype=np.uint8).take(values).tobytes()
+        else:
+            try:
+                octets = array.array('B', memv).tobytes()
+            except OverflowError:
+                pass
+            else:
+                return octets.translate(_grade_table())
+    if np is None:
+        return ''.join(map(grade, memv.tolist())).encode('ascii')
+    indexes = np.searchsorted(breakpoints, np.asarray(memv).ravel(), side='right')
+    letters = np.frombuffer(grades.encode('ascii'), dtype=np.uint8)
+    return letters[indexes].tobytes()
 
-random.seed()
 
-my_list = []
-for i in range(SIZE):
-    new_item = random.randrange(SIZE * 2)
-    bisect.insort(my_list, new_item)
-    print(f'{new_item:2d} -> {my_list}')
+def main():
+    # random is only used by the insort demo, so it is imported when the demo runs, not when the module is imported
+    import random
+
+    # this is amazing how this can be done on one line
+    scores = [grade(score) for score in [55, 60, 65, 70, 75, 80, 85, 90, 95]]
+    print(scores)
+
+    # bisect can also be used for inserting items in a sorted sequence without disrupting the order of the sequence
+    # insort(seq, item) inserts item into seq so as to keep seq in ascending order
+    # each insort still shifts the tail of the list, so building a list of n items this way is O(n**2).
+    # for millions of items, sorted_list.SortedList offers the same add/bisect_left/bisect_right operations on blocks.
+
+    random.seed()
+
+    my_list = []
+    with section('insort loop'):
+        for i in range(SIZE):
+            new_item = random.randrange(SIZE * 2)
+            bisect.insort(my_list, new_item)
+            print(f'{new_item:2d} -> {my_list}')
+
+
+if __name__ == '__main__':
+    main()
 
 """
 if __name__ == '__main__':
@@ -0,0 +1,111 @@
+# a Monte Carlo dealing engine for the FrenchDeck in dunder_examples.py
+
+# dealing with random.choice(deck) builds and returns one Card namedtuple per call. To simulate millions of deals,
+# each card is encoded instead as a small int: its position in a brand new FrenchDeck, so 0..12 are the spades from
+# 2 to A, 13..25 the diamonds, and so on. A shoe of n decks is then an int8 NumPy array, and
+# Generator.permuted shuffles thousands of shoes (one per row) in a single call. Cards are only turned back into Card
+# namedtuples by decode, when someone wants to look at them.
+
+# independent trials are spread over a process pool. numpy.random.SeedSequence.spawn derives one independent seed
+# per worker from a single root seed, so a run is reproducible: the same seed and number of workers give the same
+# result, regardless of how the operating system schedules the processes.
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# the same encoding as Card.code and Shoe in dunder_examples, so a Shoe's codes can be handed to NumPy as they are
+from dunder_examples import CARD_CODES, CARDS, Card, FrenchDeck
+
+DECK_SIZE = len(CARDS)
+
+
+def encode(cards):
+    return np.fromiter((CARD_CODES[card] for card in cards), dtype=np.int8)
+
+
+# negative int8 codes would index CARDS from the end, so the whole array is range-checked first
+def decode(codes):
+    codes = np.asarray(codes).ravel()
+    if codes.size and ((codes < 0) | (codes >= DECK_SIZE)).any():
+        raise ValueError(f'card codes are 0 to {DECK_SIZE - 1}')
+    return [CARDS[code] for code in codes]
+
+
+# shuffle `shoes` independent shoes of `decks` decks each. Returns an int8 array with one shoe per row
+def shuffled_shoes(rng, shoes, decks=1):
+    base = np.tile(np.arange(DECK_SIZE, dtype=np.int8), (shoes, decks))
+    return rng.permuted(base, axis=1, out=base)
+
+
+# cut every shoe into consecutive hands of hand_size cards: shape (shoes * hands per shoe, hand_size)
+def deal_hands(rng, shoes, hand_size=5, decks=1):
+    cards = shuffled_shoes(rng, shoes, decks)
+    per_shoe = cards.shape[1] // hand_size
+    return cards[:, :per_shoe * hand_size].reshape(-1, hand_size)
+
+
+# an example statistic: how many hands hold at least one ace. Ranks are code % 13, and the ace is rank 12
+def count_aces(hands):
+    return int((hands % 13 == 12).any(axis=1).sum())
+
+
+def _run_worker(seed_sequence, hands, statistic, hand_size, decks, batch):
+    rng = np.random.default_rng(seed_sequence)
+    per_shoe = DECK_SIZE * decks // hand_size
+    total = 0
+    done = 0
+    while done < hands:
+        shoes = min(batch, -(-(hands - done) // per_shoe))
+        dealt = deal_hands(rng, shoes, hand_size, decks)[:hands - done]
+        total += statistic(dealt)
+        done += len(dealt)
+    return total
+
+
+# deal `hands` hands in total, split evenly across `workers` processes, and return the sum of statistic(hands)
+# over all batches. statistic must be a module-level function so it can be pickled to the workers.
+def simulate(hands, statistic=count_aces, hand_size=5, decks=1, seed=None, workers=None, batch=10_000):
+    workers = workers or 1
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    shares = [hands // workers + (1 if i < hands % workers else 0) for i in range(workers)]
+    if workers == 1:
+        return _run_worker(seeds[0], shares[0], statistic, hand_size, decks, batch)
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(_run_worker, seeds, shares, [statistic] * workers,
+                               [hand_size] * workers, [decks] * workers, [batch] * workers)
+        return sum(results)
+
+
+def benchmark(hands=10**6, hand_size=5, workers=(1, 4)):
+    import random
+    from time import perf_counter
+
+    deck = FrenchDeck()
+    baseline_hands = hands // 100
+    t0 = perf_counter()
+    for i in range(baseline_hands):
+        hand = [random.choice(deck) for card in range(hand_size)]
+    baseline = baseline_hands / (perf_counter() - t0)
+    print(f'random.choice:       {baseline:14,.0f} hands/s')
+
+    for n in workers:
+        t0 = perf_counter()
+        aces = simulate(hands, hand_size=hand_size, seed=42, workers=n)
+        rate = hands / (perf_counter() - t0)
+        print(f'numpy, {n} worker(s): {rate:14,.0f} hands/s ({rate / baseline:.0f}x), '
+              f'P(at least one ace) = {aces / hands:.4f}')
+
+
+def main():
+    rng = np.random.default_rng(2024)
+    hands = deal_hands(rng, shoes=1)
+    print(hands[:2])
+    print(decode(hands[0]))
+    print(encode([Card('A', 'spades'), Card('2', 'hearts')]))
+    # the exact value is 1 - C(48, 5) / C(52, 5) = 0.3412
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
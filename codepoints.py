@@ -0,0 +1,138 @@
+# bulk code point conversion, and a timing harness for the comprehension variants in list_comprehension.py
+
+# every variant in list_comprehension.py -- the listcomp, the for loop with append, map/filter, the genexp fed to
+# tuple or array -- calls ord once per character, which creates a one-character str and an int object each time.
+# str.encode('utf-32-le') does the same conversion in one C loop: every character becomes exactly 4 bytes holding
+# its code point, little-endian. array.frombytes then adopts those bytes as unsigned 32-bit ints, with no Python
+# object per character anywhere. The 'surrogatepass' error handler encodes a lone surrogate such as '\ud800' (a
+# valid str, which ord accepts) as its code point too, instead of raising UnicodeEncodeError.
+
+# the filter ord(s) > 40 from list_comprehension.py is vectorized with NumPy when it is installed: the encoded bytes
+# are viewed as a uint32 array, and a boolean mask keeps the code points above the threshold. Without NumPy, a regular
+# expression character class deletes all characters up to chr(40) in one pass of the re engine before encoding.
+
+"""
+    >>> codepoints('#$%^&*(*')
+    array('I', [35, 36, 37, 94, 38, 42, 40, 42])
+    >>> beyond('#$%^&*(*', 40)
+    array('I', [94, 42, 42])
+    >>> codepoints('a\\ud800b'), beyond('a\\ud800b', 97)
+    (array('I', [97, 55296, 98]), array('I', [55296, 98]))
+
+"""
+
+import functools
+import re
+import sys
+from array import array
+
+# array('I') is 4 bytes wide on every mainstream platform, but the C standard only promises 2
+CODEPOINT_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+
+def codepoints(text):
+    codes = array(CODEPOINT_TYPECODE)
+    codes.frombytes(text.encode('utf-32-le', 'surrogatepass'))
+    if sys.byteorder == 'big':
+        codes.byteswap()
+    return codes
+
+
+@functools.lru_cache
+def _at_most(threshold):
+    return re.compile(f'[\\x00-{re.escape(chr(threshold))}]+')
+
+
+# code points greater than threshold, like [ord(s) for s in text if ord(s) > threshold]
+def beyond(text, threshold=40):
+    try:
+        import numpy as np
+    except ImportError:
+        return codepoints(_at_most(threshold).sub('', text))
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    kept = array(CODEPOINT_TYPECODE)
+    kept.frombytes(codes[codes > threshold].astype(np.uint32).tobytes())
+    return kept
+
+
+# the variants from list_comprehension.py, each taking the text and returning the code points in some container
+def listcomp(text):
+    return [ord(symbol) for symbol in text]
+
+
+def for_loop(text):
+    codes = []
+    for symbol in text:
+        codes.append(ord(symbol))
+    return codes
+
+
+def listcomp_filter(text):
+    return [ord(s) for s in text if ord(s) > 40]
+
+
+def map_filter(text):
+    return list(filter(lambda c: c > 40, map(ord, text)))
+
+
+def tuple_genexp(text):
+    return tuple(ord(symbol) for symbol in text)
+
+
+def array_genexp(text):
+    return array('I', (ord(symbol) for symbol in text))
+
+
+def list_map(text):
+    return list(map(ord, text))
+
+
+VARIANTS = [listcomp, for_loop, list_map, tuple_genexp, array_genexp, codepoints]
+FILTER_VARIANTS = [listcomp_filter, map_filter, beyond]
+
+
+# time each variant over texts of each size and report ns per character. Variants that create one Python object per
+# character are skipped above object_limit characters: at 100 MB, a list of ints alone takes several GB
+def time_variants(variants=VARIANTS + FILTER_VARIANTS, sizes=(10, 10**3, 10**5, 10**7), object_limit=10**7,
+                  alphabet='#$%^&*(*abcdé€😀'):
+    from time import perf_counter
+
+    results = {}
+    for size in sizes:
+        text = (alphabet * (size // len(alphabet) + 1))[:size]
+        # repeat small sizes so each measurement lasts long enough to be meaningful
+        repeat = max(1, 10**5 // size)
+        for variant in variants:
+            if size > object_limit and variant not in (codepoints, beyond):
+                continue
+            t0 = perf_counter()
+            for i in range(repeat):
+                variant(text)
+            elapsed = (perf_counter() - t0) / repeat
+            results[variant.__name__, size] = elapsed / size * 1e9
+    return results
+
+
+def report(results):
+    names = list(dict.fromkeys(name for name, size in results))
+    sizes = sorted({size for name, size in results})
+    print(f'{"ns/char":15}' + ''.join(f'{size:>12,}' for size in sizes))
+    for name in names:
+        cells = (f'{results[name, size]:12.2f}' if (name, size) in results else f'{"-":>12}' for size in sizes)
+        print(f'{name:15}' + ''.join(cells))
+
+
+def main():
+    # python codepoints.py 100000000 runs the fast variants on 100 MB of text
+    sizes = (10, 10**3, 10**5, 10**7)
+    if len(sys.argv) > 1:
+        sizes += (int(sys.argv[1]),)
+    for variant in VARIANTS:
+        assert list(variant('#$%^&*(*é😀')) == list(codepoints('#$%^&*(*é😀'))
+    for variant in FILTER_VARIANTS:
+        assert list(variant('#$%^&*(*é😀')) == list(beyond('#$%^&*(*é😀'))
+    report(time_variants(sizes=sizes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# longest-prefix lookup of country dial codes, built from the dial_codes list in dictionaries.py
+
+# country_dial and the code -> country dict comprehension in dictionaries.py only match whole keys. A phone number
+# such as 5511987654321 starts with its country code, and the codes have different lengths: 1, 7, 55, 880. The
+# right answer is the longest code that is a prefix of the number, so 1684... (American Samoa) wins over 1... when
+# both are in the table.
+
+# DialIndex answers that with a per-length cascade of dicts: one dict per code length, tried from the longest length
+# down, each probe being one slice and one hash lookup. When no code is longer than `dense_digits` digits, the index
+# also precomputes the answer for every possible prefix of that length (10**4 slots for 4-digit codes), so a lookup
+# becomes a single list access: table[int(number[:4])]. That shortcut is only taken when the first `width` characters
+# are all ASCII digits: int() also accepts spaces, underscores and non-ASCII digits, so '55 11 9876' would become
+# slot 055 instead of matching 55. Anything else goes through the cascade, which compares the text as it is.
+
+"""
+    >>> index = DialIndex(dial_codes + [(1684, 'American Samoa')])
+    >>> index.lookup('+5511987654321')
+    (55, 'Brazil')
+    >>> index.lookup('16845551234'), index.lookup('12125551234')
+    ((1684, 'American Samoa'), (1, 'United States'))
+    >>> index.lookup_many(['8801711000000', '999']) == [(880, 'Bangladesh'), None]
+    True
+    >>> index.lookup('55 11 9876'), index.lookup('+1 212')
+    ((55, 'Brazil'), (1, 'United States'))
+
+"""
+
+from dictionaries import dial_codes
+
+
+class DialIndex:
+
+    def __init__(self, codes, dense_digits=6):
+        # {length: {'55': (55, 'Brazil'), ...}, ...}
+        self._by_length = {}
+        for code, country in codes:
+            key = str(code)
+            self._by_length.setdefault(len(key), {})[key] = (code, country)
+        self._lengths = sorted(self._by_length, reverse=True)
+        self._width = self._lengths[0] if self._lengths else 0
+        self._table = None
+        if 0 < self._width <= dense_digits:
+            self._table = self._build_table()
+
+    def __len__(self):
+        return sum(len(codes) for codes in self._by_length.values())
+
+    # resolve every prefix of self._width digits once, with the cascade
+    def _build_table(self):
+        width = self._width
+        return [self._cascade(f'{prefix:0{width}d}') for prefix in range(10**width)]
+
+    def _cascade(self, digits):
+        for length in self._lengths:
+            entry = self._by_length[length].get(digits[:length])
+            if entry is not None:
+                return entry
+        return None
+
+    @staticmethod
+    def _digits(number):
+        number = str(number)
+        return number[1:] if number.startswith('+') else number
+
+    # returns (code, country) for the longest code that prefixes the number, or None
+    def lookup(self, number):
+        digits = self._digits(number)
+        if self._table is not None:
+            prefix = digits[:self._width]
+            if len(prefix) == self._width and prefix.isascii() and prefix.isdigit():
+                return self._table[int(prefix)]
+        return self._cascade(digits)
+
+    def lookup_many(self, numbers):
+        table, width = self._table, self._width
+        if table is None:
+            cascade, digits = self._cascade, self._digits
+            return [cascade(digits(n)) for n in numbers]
+        # the fast path stays inside one list comprehension; short, '+' or formatted numbers take the general route
+        lookup = self.lookup
+        return [table[int(prefix)] if len(prefix) == width and prefix.isascii() and prefix.isdigit() else lookup(n)
+                for n in map(str, numbers) for prefix in (n[:width],)]
+
+
+def benchmark(codes=5000, numbers=10**6):
+    import random
+    import tracemalloc
+    from time import perf_counter
+
+    # a synthetic code table with a mix of lengths like the real ITU plan, i.e. 1, 1684, 44, 880...
+    random.seed(7)
+    table = dict(dial_codes)
+    while len(table) < codes:
+        length = random.randrange(2, 5)
+        table[random.randrange(10**(length - 1), 10**length)] = f'country {len(table)}'
+    table = list(table.items())
+
+    for dense_digits in (0, 6):
+        tracemalloc.start()
+        t0 = perf_counter()
+        index = DialIndex(table, dense_digits=dense_digits)
+        build = perf_counter() - t0
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        phone_numbers = [str(random.randrange(10**10, 10**13)) for i in range(numbers)]
+        t0 = perf_counter()
+        found = index.lookup_many(phone_numbers)
+        elapsed = perf_counter() - t0
+        kind = 'dense table' if index._table is not None else 'dict cascade'
+        print(f'{kind:12}: {len(index):,} codes, built in {build:.2f}s, {memory / 2**20:.1f} MiB, '
+              f'{numbers / elapsed:,.0f} lookups/s ({sum(f is not None for f in found):,} matched)')
+
+
+def main():
+    index = DialIndex(dial_codes)
+    for number in ['+5511987654321', '74951234567', '8801711000000', '12125551234', '999']:
+        print(number, index.lookup(number))
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,20 +2,52 @@
 # A Pythonic card deck implementing a few dunder methods.
 
 import collections
-from random import choice
+from array import array
+
+from instrument import section
+
 
 # construct class here using namedtuple. namedtuple will build classes of objects
 # that are just bundles of attributes with no custom methods, similar to a database record
-Card = collections.namedtuple('Card', ['rank', 'suit'])
+# Card subclasses the namedtuple to add a pool of canonical cards: there are only 52 distinct cards, so Card.of returns
+# the same object every time instead of building another tuple. __slots__ = () keeps instances as small as the tuple.
+class Card(collections.namedtuple('Card', ['rank', 'suit'])):
+    __slots__ = ()
+    _pool = {}
+
+    @classmethod
+    def of(cls, rank, suit):
+        try:
+            return cls._pool[rank, suit]
+        except KeyError:
+            card = cls._pool[rank, suit] = cls(rank, suit)
+            return card
+
+    # the position of the card in a new FrenchDeck: 0..12 are the spades from 2 to A, 13..25 the diamonds, and so on
+    @property
+    def code(self):
+        return CARD_CODES[self]
+
+    # CARDS[-1] would quietly be the ace of hearts, so codes are checked rather than used as list indexes directly
+    @staticmethod
+    def fromcode(code):
+        if not 0 <= code < len(CARDS):
+            raise ValueError(f'card codes are 0 to {len(CARDS) - 1}, not {code}')
+        return CARDS[code]
 
 
 class FrenchDeck:
     ranks = [str(n) for n in range(2, 11)] + list('JQKA')
     suits = 'spades diamonds clubs hearts'.split()
 
-    def __init__(self):
-        self._cards = [Card(rank, suit) for suit in self.suits
-                       for rank in self.ranks]
+    # decks > 1 builds a multi-deck shoe: the same 52 cards repeated, as used at casino tables
+    def __init__(self, decks=1):
+        self._cards = [Card.of(rank, suit) for suit in self.suits
+                       for rank in self.ranks] * decks
+        # map each card to its first position. A dict lookup makes `in` and index O(1) instead of a sequential scan
+        self._positions = {}
+        for position, card in enumerate(self._cards):
+            self._positions.setdefault(card, position)
 
     def __len__(self):
         return len(self._cards)
@@ -23,57 +55,183 @@ class FrenchDeck:
     def __getitem__(self, position):
         return self._cards[position]
 
+    def __contains__(self, card):
+        return card in self._positions
 
-deck = FrenchDeck()
-print(f"Length of deck: {len(deck)}")
+    def index(self, card):
+        try:
+            return self._positions[card]
+        except KeyError:
+            raise ValueError(f'{card!r} is not in deck') from None
 
-beer_card = Card('7', 'diamonds')
-print(beer_card)
 
-# the __getitem__ method provides the ability to read cards
-print(deck[0])
-print(deck[-1])
+# the pooled cards in FrenchDeck order, so CARDS[code] decodes a card and CARD_CODES[card] encodes it
+CARDS = list(FrenchDeck())
+CARD_CODES = {card: code for code, card in enumerate(CARDS)}
 
-# print out random card using random.choice method. It will return a random card.
-print(choice(deck))
-print(choice(deck))
-print(choice(deck))
 
-# look at the top three cards from a brand new deck, and then pick Aces by
-# starting at index 12 and skipping 13 cards at a time
+# a shoe of decks stored as one signed byte per card (array('b')) instead of a list of references: 8 times smaller,
+# and copying, slicing or shuffling it moves bytes, not objects. Items are decoded to the pooled Cards on access,
+# so the shoe supports the same protocol as FrenchDeck: len, indexing, slicing, iteration, reversed, in,
+# random.choice, random.shuffle and sorted.
+class Shoe:
 
-print(deck[:3])
-print(deck[12::13])
+    def __init__(self, decks=1):
+        self.codes = array('b', range(len(CARDS))) * decks
 
-# We can also iterate through the deck by implementing the __getitem__ method
-# any call of a dunder method usually is implicit. You don't have to worry about calling a dunder method yourself.
-for card in deck:
-    print(card)
+    # every code must be 0..51: a negative one would decode through negative list indexing to the wrong card
+    @classmethod
+    def fromcodes(cls, codes):
+        try:
+            codes = array('b', codes)
+        except OverflowError:
+            raise ValueError(f'card codes are 0 to {len(CARDS) - 1}') from None
+        if codes and not (min(codes) >= 0 and max(codes) < len(CARDS)):
+            raise ValueError(f'card codes are 0 to {len(CARDS) - 1}')
+        return cls._wrap(codes)
 
-# iterate through the deck in reverse
-for card in reversed(deck):
-    print(card)
+    # a Shoe around codes that are already known to be valid
+    @classmethod
+    def _wrap(cls, codes):
+        shoe = cls(0)
+        shoe.codes = codes
+        return shoe
 
-# because collection has no __contains__ method, the in operator does a sequential scan.
-# returns true or false depending on whether card is in deck
-print(Card('Q', 'hearts') in deck)
-print(Card('7', 'beasts') in deck)
+    @classmethod
+    def fromcards(cls, cards):
+        return cls.fromcodes(CARD_CODES[card] for card in cards)
 
-# We can also sort the deck by ranking cards, with aces being the highest.
-suit_values = dict(spades=3, hearts=2, diamonds=1, clubs=0)
+    def __len__(self):
+        return len(self.codes)
 
-print('\n')
+    # a slice is another Shoe over a copy of the codes
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return self._wrap(self.codes[position])
+        return CARDS[self.codes[position]]
 
+    def __setitem__(self, position, card):
+        self.codes[position] = CARD_CODES[card]
 
-def spades_high(card):
-    rank_value = FrenchDeck.ranks.index(card.rank)
-    return rank_value * len(suit_values) + suit_values[card.suit]
+    def __iter__(self):
+        return map(CARDS.__getitem__, self.codes)
 
+    def __contains__(self, card):
+        code = CARD_CODES.get(card)
+        return code is not None and code in self.codes
 
-# with the spades_high function, we can list our deck in order of increasing rank
-for card in sorted(deck, key=spades_high):
-    print(card)
+    def count(self, card):
+        code = CARD_CODES.get(card)
+        return 0 if code is None else self.codes.count(code)
 
-# if you need invoke a special method, it is usually better to call the related build-in function (e.g. len, iter, str).
-# These built-ins call the corresponding special method.
+    def __eq__(self, other):
+        if not isinstance(other, Shoe):
+            return NotImplemented
+        return self.codes == other.codes
 
+    def __repr__(self):
+        return f'{type(self).__name__}.fromcards({list(self)!r})'
+
+
+# We can also sort the deck by ranking cards, with aces being the highest.
+suit_values = dict(spades=3, hearts=2, diamonds=1, clubs=0)
+
+
+def spades_high(card):
+    return spades_high_values[card]
+
+
+# FrenchDeck.ranks.index(card.rank) is a linear search of the ranks list, paid on every call of the key function.
+# Instead, the value of each of the 52 cards is computed once, and spades_high is a single dict lookup.
+rank_values = {rank: value for value, rank in enumerate(FrenchDeck.ranks)}
+spades_high_values = {card: rank_values[card.rank] * len(suit_values) + suit_values[card.suit]
+                      for card in FrenchDeck()}
+
+
+def main():
+    # random.choice and random.shuffle are only needed by the demo
+    from random import choice, shuffle
+
+    deck = FrenchDeck()
+    print(f"Length of deck: {len(deck)}")
+
+    beer_card = Card('7', 'diamonds')
+    print(beer_card)
+    # Card.of returns the pooled card, the very object every FrenchDeck holds, and code is its position in a new deck
+    print(Card.of('7', 'diamonds') is deck[18], Card.of('7', 'diamonds').code, Card.fromcode(18))
+
+    # the __getitem__ method provides the ability to read cards
+    print(deck[0])
+    print(deck[-1])
+
+    # print out random card using random.choice method. It will return a random card.
+    print(choice(deck))
+    print(choice(deck))
+    print(choice(deck))
+
+    # look at the top three cards from a brand new deck, and then pick Aces by
+    # starting at index 12 and skipping 13 cards at a time
+
+    print(deck[:3])
+    print(deck[12::13])
+
+    # We can also iterate through the deck by implementing the __getitem__ method
+    # any call of a dunder method usually is implicit. You don't have to worry about calling a dunder method yourself.
+    for card in deck:
+        print(card)
+
+    # iterate through the deck in reverse
+    for card in reversed(deck):
+        print(card)
+
+    # without a __contains__ method, the in operator would fall back to a sequential scan using __getitem__.
+    # FrenchDeck implements __contains__ with a dict lookup instead.
+    # returns true or false depending on whether card is in deck
+    print(Card('Q', 'hearts') in deck)
+    print(Card('7', 'beasts') in deck)
+
+    print('\n')
+
+    # with the spades_high function, we can list our deck in order of increasing rank
+    with section('sort spades_high'):
+        ordered = sorted(deck, key=spades_high)
+    for card in ordered:
+        print(card)
+
+    # if you need invoke a special method, it is usually better to call the related build-in function
+    # (e.g. len, iter, str).
+    # These built-ins call the corresponding special method.
+
+    # a six-deck Shoe stores its 312 cards as bytes. Shuffling the codes moves bytes instead of references
+    shoe = Shoe(6)
+    shuffle(shoe.codes)
+    print(len(shoe), shoe[:3], choice(shoe), sorted(shoe[:5], key=spades_high))
+
+
+def time_deck(decks_list=(1, 8, 1000)):
+    import sys
+    from timeit import timeit
+
+    # the old key function, for comparison
+    def spades_high_scan(card):
+        rank_value = FrenchDeck.ranks.index(card.rank)
+        return rank_value * len(suit_values) + suit_values[card.suit]
+
+    missing = Card('7', 'beasts')
+    for decks in decks_list:
+        shoe = FrenchDeck(decks)
+        cards = shoe._cards
+        # a card that is not in the deck is the worst case for a sequential scan
+        scan = timeit(lambda: missing in cards, number=100) / 100
+        hashed = timeit(lambda: missing in shoe, number=100) / 100
+        sort_scan = timeit(lambda: sorted(shoe, key=spades_high_scan), number=1)
+        sort_table = timeit(lambda: sorted(shoe, key=spades_high), number=1)
+        print(f'{decks:5} decks ({len(shoe):6} cards): '
+              f'in: scan {scan * 1e6:9.2f}us, dict {hashed * 1e6:6.2f}us | '
+              f'sort: ranks.index {sort_scan * 1e3:8.2f}ms, table {sort_table * 1e3:8.2f}ms | '
+              f'list {sys.getsizeof(cards):9,} bytes, Shoe {sys.getsizeof(Shoe(decks).codes):8,} bytes')
+
+
+if __name__ == '__main__':
+    main()
+    time_deck()
@@ -0,0 +1,130 @@
+# sorting traveler_ids-style records that do not fit in memory
+
+# sorted(...) and list.sort, as used in tuples.py and slicing_and_sequences.py, need the whole dataset in one list.
+# An external merge sort only ever holds `run_size` records at a time:
+# 1. read up to run_size records, sort them with the usual key= and reverse= arguments, and spill the sorted run to
+#    a temporary file
+# 2. repeat until the input is exhausted
+# 3. heapq.merge reads all the runs at once, a buffer at a time, and yields the records in sorted order
+
+# the result is identical to sorted(records, key=key, reverse=reverse), stability included: sorted keeps equal items
+# in input order within each run, and on ties heapq.merge takes items from the earlier run first. Runs are written
+# in input order, so equal items from different runs also come out in input order.
+
+"""
+    >>> from tuples import traveler_ids
+    >>> list(external_sort(traveler_ids, run_size=2))
+    [('BRA', 'CE342567'), ('ESP', 'XDA205'), ('USA', '31195855')]
+    >>> records = [(3, 'a'), (1, 'b'), (3, 'c'), (1, 'd'), (2, 'e')]
+    >>> list(external_sort(records, key=lambda r: r[0], reverse=True, run_size=2)) == sorted(
+    ...     records, key=lambda r: r[0], reverse=True)
+    True
+
+"""
+
+import csv
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+
+# records are pickled in batches: one pickle per record would spend most of the time in per-call overhead
+BATCH_SIZE = 1024
+
+
+def _spill(run, directory):
+    fp = tempfile.TemporaryFile(dir=directory)
+    for start in range(0, len(run), BATCH_SIZE):
+        pickle.dump(run[start:start + BATCH_SIZE], fp, pickle.HIGHEST_PROTOCOL)
+    fp.seek(0)
+    return fp
+
+
+def _read_run(fp):
+    while True:
+        try:
+            batch = pickle.load(fp)
+        except EOFError:
+            return
+        yield from batch
+
+
+# yields the records of iterable in sorted order, holding at most run_size records (plus one read buffer per run)
+# in memory. Temporary files go to directory, or to the system default for tempfile
+def external_sort(iterable, key=None, reverse=False, run_size=100_000, directory=None):
+    if run_size < 1:
+        raise ValueError('run_size must be at least 1')
+    it = iter(iterable)
+    runs = []
+    try:
+        while True:
+            run = list(islice(it, run_size))
+            if not run:
+                break
+            run.sort(key=key, reverse=reverse)
+            if not runs and len(run) < run_size:
+                # everything fit in one run: no need to touch the disk
+                yield from run
+                return
+            runs.append(_spill(run, directory))
+            del run
+        yield from heapq.merge(*map(_read_run, runs), key=key, reverse=reverse)
+    finally:
+        for fp in runs:
+            fp.close()
+
+
+# stream (country_code, passport_number) style tuples from a CSV file, one row at a time
+def read_records(path, **fmtparams):
+    with open(path, newline='') as fp:
+        for row in csv.reader(fp, **fmtparams):
+            yield tuple(row)
+
+
+def write_records(records, path, **fmtparams):
+    with open(path, 'w', newline='') as fp:
+        csv.writer(fp, **fmtparams).writerows(records)
+
+
+def benchmark(records=10**6, run_size=10**5):
+    import os
+    import random
+    import string
+    import tracemalloc
+    from time import perf_counter
+
+    countries = ['USA', 'BRA', 'ESP', 'JPN', 'IND', 'NGA']
+    path = 'traveler_ids.csv'
+    write_records(((random.choice(countries), ''.join(random.choices(string.ascii_uppercase + string.digits, k=8)))
+                   for i in range(records)), path)
+    try:
+        tracemalloc.start()
+        t0 = perf_counter()
+        expected = sorted(read_records(path))
+        in_memory = perf_counter() - t0
+        _, peak_in_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        t0 = perf_counter()
+        matches = all(a == b for a, b in zip(external_sort(read_records(path), run_size=run_size), expected))
+        external = perf_counter() - t0
+        _, peak_external = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.remove(path)
+    print(f'{records:,} records: sorted {in_memory:.2f}s, peak {peak_in_memory / 2**20:.0f} MiB | '
+          f'external_sort (run_size={run_size:,}) {external:.2f}s, peak {peak_external / 2**20:.0f} MiB '
+          f'(not counting the expected list) | identical: {matches}')
+
+
+def main():
+    from tuples import traveler_ids
+
+    for passport in external_sort(traveler_ids, run_size=2):
+        print('%s/%s' % passport)
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# reading floats.bin-style files (packed doubles written by array.tofile in arrays.py) without loading them into RAM
+
+# array.fromfile copies every byte of the file into the array before you can look at a single value. For files larger
+# than memory, that is not an option. mmap maps the file into the address space of the process instead: the operating
+# system loads a page (usually 4 KB) from disk only when it is touched, and may drop it again under memory pressure.
+
+# memoryview.cast('d') reinterprets the mapped bytes as doubles without copying anything, the same way arrays.py casts
+# an array('B') to two dimensions. Indexing the view reads 8 bytes straight out of the mapped page.
+
+import mmap
+from array import array
+from collections import abc
+
+from slice_view import SliceView
+
+
+class FloatStore(abc.Sequence):
+    typecode = 'd'
+
+    def __init__(self, path, typecode=None):
+        if typecode is not None:
+            self.typecode = typecode
+        self._file = open(path, 'rb')
+        try:
+            # mmap refuses to map an empty file, so an empty store is just an empty view
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._mmap = None
+            self._view = memoryview(b'').cast(self.typecode)
+        else:
+            # a trailing partial item (i.e. from a truncated write) is left out of the view
+            itemsize = array(self.typecode).itemsize
+            usable = len(self._mmap) - len(self._mmap) % itemsize
+            self._view = memoryview(self._mmap)[:usable].cast(self.typecode)
+
+    # len is computed from the file size alone: no data is read
+    def __len__(self):
+        return len(self._view)
+
+    # an int index costs at most one page fault. A slice returns a SliceView: a range of positions over the mapped
+    # values, so store[:] reads nothing and copies nothing. The SliceView holds no export of the mapping, so it does
+    # not stop close(); after close() it raises ValueError. Its copy() and memoryview() are memoryview slices, which
+    # do hold an export, like the chunks of chunks()
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SliceView(self._view, index)
+        return self._view[index]
+
+    # one bounded chunk at a time is copied to a list and released before any of it is yielded, so a suspended
+    # iterator holds no export of the mapping and never blocks close()
+    def __iter__(self):
+        for chunk in self.chunks():
+            with chunk:
+                values = chunk.tolist()
+            yield from values
+
+    # yield consecutive memoryview slices of at most size items: only the pages of the current chunk need to be
+    # resident. The slices share the mapped pages, so release each one (or drop it) before close()
+    def chunks(self, size=2**16):
+        for start in range(0, len(self), size):
+            yield self._view[start:start + size]
+
+    def tolist(self):
+        return self._view.tolist()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._file.name!r}, length={len(self)})'
+
+    # a chunk from chunks() that is still alive holds a reference to the mapping, and mmap.close() raises BufferError.
+    # The file is closed either way, so the handle does not leak; close() can be called again once the chunk is gone
+    def close(self):
+        try:
+            self._view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    import os
+    from random import random
+    from time import perf_counter
+
+    path = 'floats.bin'
+    if not os.path.exists(path):
+        with open(path, 'wb') as fp:
+            array('d', (random() for i in range(10**7))).tofile(fp)
+
+    t0 = perf_counter()
+    with FloatStore(path) as store:
+        last = store[-1]
+        n = len(store)
+    print(f'FloatStore: len={n:,}, last={last!r} in {perf_counter() - t0:.6f}s')
+
+    t0 = perf_counter()
+    floats = array('d')
+    with open(path, 'rb') as fp:
+        floats.fromfile(fp, os.path.getsize(path) // floats.itemsize)
+    print(f'array.fromfile: len={len(floats):,}, last={floats[-1]!r} in {perf_counter() - t0:.6f}s')
+
+    # a chunked pass touches every page once, but never holds more than one chunk of values as Python floats
+    with FloatStore(path) as store:
+        total = 0.0
+        for chunk in store.chunks():
+            total += sum(chunk)
+            chunk.release()
+    print(f'chunked sum: {total:.3f}')
+
+
+if __name__ == '__main__':
+    main()
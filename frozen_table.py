@@ -0,0 +1,328 @@
+# a read-only mapping for static lookup tables: a minimal perfect hash over compact arrays, saved to a file that
+# loads with one mmap
+
+# not a faster dict: a lookup here runs in Python and is 15 to 25 times slower than a dict lookup (see benchmark()).
+# Replace a dict with a FrozenTable to save memory (about a third of the bytes per key) and startup time, not to speed
+# up lookups.
+
+# country_dial in dictionaries.py and suit_values in dunder_examples.py are fixed tables, rebuilt as dicts on every
+# run. A dict keeps a Python object for every key and every value plus a hash table with spare room; for a million
+# short strings that is well over 100 MB. FrozenTable stores the keys and the values packed in arrays (ints and
+# floats as 8-byte items, strings and bytes as one UTF-8 blob plus offsets), and a table of seeds that tells where
+# each key is, with no empty slots.
+
+# the hash is hash-and-displace (CHD): every key falls into a bucket by crc32(key) % buckets. Buckets are placed
+# largest first: for each one, the builder tries displacements d = 1, 2, ... until the slots
+# (crc32(key) + d * adler32(key)) % n of all its keys are free, and records d as the seed of the bucket. Buckets
+# with one key are placed last, straight into a free slot, recorded as a negative seed. Both checksums come from
+# zlib, so they are the same in every run and on every machine (hash() of a str is not), and a saved table stays
+# valid. A lookup is then two checksums, one seed and one comparison of the stored key, to reject missing keys.
+
+# load() maps the file and casts memoryviews over it, so opening a million-key table reads nothing until the first
+# lookup, and processes that map the same file share its pages.
+
+"""
+    >>> from dictionaries import country_dial
+    >>> dial = FrozenTable(country_dial)
+    >>> dial['Brazil'], len(dial), 'Atlantis' in dial
+    (55, 10, False)
+    >>> dial.get('Atlantis', 0), dict(dial) == country_dial
+    (0, True)
+    >>> dial.get('\\ud800', 0), '\\ud800' in dial, 3.5 in dial
+    (0, False, False)
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'dial.ft')
+    >>> dial.save(path)
+    >>> with FrozenTable.load(path) as loaded:
+    ...     loaded['Japan'], loaded == dial
+    (81, True)
+
+"""
+
+import mmap
+import struct
+from array import array
+from collections import abc
+from zlib import adler32, crc32
+
+MAGIC = b'FTB1'
+# magic, key kind, value kind, number of keys, number of buckets, key blob size, value blob size
+HEADER = struct.Struct('<4sBB2xQQQQ')
+INT, FLOAT, STR, BYTES = range(4)
+
+# keys per bucket, on average. Fewer buckets make the seed table smaller and the build slower
+BUCKET_SIZE = 2
+
+
+def _kind(items, allow_float=False):
+    types = {type(item) for item in items}
+    if types <= {int, bool}:
+        return INT
+    if allow_float and types <= {int, bool, float}:
+        return FLOAT
+    if types <= {str}:
+        return STR
+    if types <= {bytes}:
+        return BYTES
+    names = sorted(t.__name__ for t in types)
+    raise TypeError(f'a FrozenTable holds ints, floats, str or bytes of one kind, not {names}')
+
+
+def _int_bytes(item):
+    return int.to_bytes(item, 8, 'little', signed=True)
+
+
+def _same_bytes(item):
+    if type(item) is not bytes:
+        raise TypeError(f'expected bytes, not {type(item).__name__}')
+    return item
+
+
+# each raises TypeError for an item of another kind, and str.encode raises UnicodeEncodeError (a ValueError) for a
+# lone surrogate, which cannot be a key either
+ENCODERS = {INT: _int_bytes, STR: str.encode, BYTES: _same_bytes}
+
+
+def _encode(kind, item):
+    return ENCODERS[kind](item)
+
+
+# str and bytes columns: one blob and n + 1 offsets; the i-th item is blob[offsets[i]:offsets[i + 1]]
+def _pack_blob(items):
+    offsets, position = array('Q', [0]), 0
+    for item in items:
+        position += len(item)
+        offsets.append(position)
+    return offsets, b''.join(items)
+
+
+# map the n encoded keys to slots 0..n-1. Returns the seeds and, for every slot, the index of its key
+def _place(encoded, buckets):
+    n = len(encoded)
+    hashes = [crc32(key) for key in encoded]
+    steps = [adler32(key) for key in encoded]
+    members = [[] for _ in range(buckets)]
+    for i, h in enumerate(hashes):
+        members[h % buckets].append(i)
+    order = sorted(range(buckets), key=lambda b: len(members[b]), reverse=True)
+    seeds = array('i', [0]) * buckets
+    key_at = array('q', [-1]) * n
+    taken = bytearray(n)
+    singles = []
+    for b in order:
+        keys = members[b]
+        if len(keys) < 2:
+            if keys:
+                singles.append(b)
+            continue
+        # slots only depend on d modulo n, so if no d up to n fits, none ever will: start over with more buckets
+        for d in range(1, n + 1):
+            slots = [(hashes[i] + d * steps[i]) % n for i in keys]
+            if len(set(slots)) == len(slots) and not any(taken[slot] for slot in slots):
+                break
+        else:
+            return None
+        seeds[b] = d
+        for i, slot in zip(keys, slots):
+            taken[slot] = 1
+            key_at[slot] = i
+    free = (slot for slot in range(n) if not taken[slot])
+    for b in singles:
+        slot = next(free)
+        seeds[b] = -slot - 1
+        key_at[slot] = members[b][0]
+    return seeds, key_at
+
+
+class FrozenTable(abc.Mapping):
+
+    def __init__(self, mapping=()):
+        pairs = list(dict(mapping).items())
+        keys = [key for key, _ in pairs]
+        values = [value for _, value in pairs]
+        self._key_kind = _kind(keys)
+        self._value_kind = _kind(values, allow_float=True)
+        encoded = [_encode(self._key_kind, key) for key in keys]
+        buckets = max(1, len(encoded) // BUCKET_SIZE)
+        placed = _place(encoded, buckets)
+        while placed is None:
+            buckets += 1
+            placed = _place(encoded, buckets)
+        self._seeds, key_at = placed
+        self._n, self._buckets = len(encoded), buckets
+        self._keys, self._key_offsets, self._key_blob = self._column(self._key_kind, [keys[i] for i in key_at])
+        self._values, self._value_offsets, self._value_blob = self._column(self._value_kind,
+                                                                           [values[i] for i in key_at])
+        self._mmap = None
+
+    # returns (array, None, None) for numbers, (None, offsets, blob) for str and bytes
+    @staticmethod
+    def _column(kind, items):
+        if kind == INT:
+            return array('q', items), None, None
+        if kind == FLOAT:
+            return array('d', items), None, None
+        offsets, blob = _pack_blob([_encode(kind, item) for item in items])
+        return None, offsets, blob
+
+    # the lookup is written out in one method: every attribute access and call is paid on each lookup
+    def __getitem__(self, key):
+        try:
+            encoded = ENCODERS[self._key_kind](key)
+        except (TypeError, ValueError, OverflowError):
+            raise KeyError(key) from None
+        if not self._n:
+            raise KeyError(key)
+        h = crc32(encoded)
+        seed = self._seeds[h % self._buckets]
+        slot = -seed - 1 if seed < 0 else (h + seed * adler32(encoded)) % self._n
+        keys = self._keys
+        if keys is not None:
+            if keys[slot] != key:
+                raise KeyError(key)
+        else:
+            offsets = self._key_offsets
+            if self._key_blob[offsets[slot]:offsets[slot + 1]] != encoded:
+                raise KeyError(key)
+        values = self._values
+        if values is not None:
+            return values[slot]
+        return self._item(self._value_kind, values, self._value_offsets, self._value_blob, slot)
+
+    @staticmethod
+    def _item(kind, numbers, offsets, blob, slot):
+        if numbers is not None:
+            return numbers[slot]
+        data = blob[offsets[slot]:offsets[slot + 1]]
+        return str(data, 'utf-8') if kind == STR else bytes(data)
+
+    def __len__(self):
+        return self._n
+
+    # keys in slot order, which is not the insertion order
+    def __iter__(self):
+        for slot in range(self._n):
+            yield self._item(self._key_kind, self._keys, self._key_offsets, self._key_blob, slot)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self)!r})'
+
+    # bytes held by the arrays, i.e. the size of the saved file minus the header and padding
+    def nbytes(self):
+        parts = [self._seeds, self._keys, self._key_offsets, self._key_blob, self._values, self._value_offsets,
+                 self._value_blob]
+        return sum(memoryview(part).nbytes for part in parts if part is not None)
+
+    def _parts(self):
+        return [(self._seeds, 'i'), (self._keys, 'q'), (self._key_offsets, 'Q'), (self._key_blob, 'B'),
+                (self._values, 'd' if self._value_kind == FLOAT else 'q'), (self._value_offsets, 'Q'),
+                (self._value_blob, 'B')]
+
+    # the header, then every array in turn, each padded to a multiple of 8 bytes so the memoryviews are aligned
+    def save(self, path):
+        with open(path, 'wb') as fp:
+            fp.write(HEADER.pack(MAGIC, self._key_kind, self._value_kind, self._n, self._buckets,
+                                 len(self._key_blob or b''), len(self._value_blob or b'')))
+            for part, _ in self._parts():
+                if part is not None:
+                    data = memoryview(part).cast('B')
+                    fp.write(data)
+                    fp.write(bytes(-len(data) % 8))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as fp:
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, key_kind, value_kind, n, buckets, key_blob, value_blob = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            mapped.close()
+            raise ValueError(f'{path} is not a FrozenTable file')
+        table = cls.__new__(cls)
+        table._key_kind, table._value_kind, table._n, table._buckets = key_kind, value_kind, n, buckets
+        numbers = (INT, FLOAT)
+        sizes = [
+            ('_seeds', 'i', buckets),
+            ('_keys', 'q', n if key_kind in numbers else None),
+            ('_key_offsets', 'Q', None if key_kind in numbers else n + 1),
+            ('_key_blob', 'B', None if key_kind in numbers else key_blob),
+            ('_values', 'd' if value_kind == FLOAT else 'q', n if value_kind in numbers else None),
+            ('_value_offsets', 'Q', None if value_kind in numbers else n + 1),
+            ('_value_blob', 'B', None if value_kind in numbers else value_blob),
+        ]
+        view, position = memoryview(mapped), HEADER.size
+        for name, typecode, count in sizes:
+            if count is None:
+                setattr(table, name, None)
+                continue
+            size = count * struct.calcsize(typecode)
+            setattr(table, name, view[position:position + size].cast(typecode))
+            position += size + -size % 8
+        table._mmap = mapped
+        return table
+
+    def close(self):
+        if self._mmap is not None:
+            for name in ('_seeds', '_keys', '_key_offsets', '_key_blob', '_values', '_value_offsets', '_value_blob'):
+                part = getattr(self, name)
+                if isinstance(part, memoryview):
+                    part.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _dict_bytes(mapping):
+    import sys
+
+    return sys.getsizeof(mapping) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in mapping.items())
+
+
+def benchmark(sizes=(10, 10**4, 10**6), path='frozen_table.ft'):
+    import os
+    import random
+    from time import perf_counter
+
+    for n in sizes:
+        # city-like names for keys and int codes for values, as in country_dial
+        random.seed(n)
+        mapping = {f'city-{i:07d}-{random.randrange(10**6):06d}': random.randrange(10**6) for i in range(n)}
+        probes = random.choices(list(mapping), k=min(n * 10, 10**5))
+
+        t0 = perf_counter()
+        table = FrozenTable(mapping)
+        build = perf_counter() - t0
+        table.save(path)
+        t0 = perf_counter()
+        loaded = FrozenTable.load(path)
+        load = perf_counter() - t0
+
+        timings = []
+        for lookup in (mapping, table, loaded):
+            t0 = perf_counter()
+            for key in probes:
+                lookup[key]
+            timings.append((perf_counter() - t0) / len(probes) * 1e9)
+        loaded.close()
+        print(f'{n:>9,} keys: dict {_dict_bytes(mapping) / n:6.0f} B/key {timings[0]:5.0f} ns | '
+              f'FrozenTable {table.nbytes() / n:4.0f} B/key {timings[1]:5.0f} ns, mmapped {timings[2]:5.0f} ns | '
+              f'build {build:6.2f}s, load {load * 1e3:.2f}ms')
+    os.remove(path)
+
+
+def main():
+    from dictionaries import country_dial
+    from dunder_examples import suit_values
+
+    dial = FrozenTable(country_dial)
+    print(dial)
+    print(dial['India'], dial.get('Atlantis'), FrozenTable(suit_values)['spades'])
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+# a 2D grid in one contiguous bytearray, to replace the list-of-lists board in slicing_and_sequences.py
+
+# board = [['_'] * 3 for i in range(3)] is a list of row lists, and every cell is an 8-byte reference to a str
+# object. A Grid stores one byte per cell in a single bytearray, row after row, so a large occupancy map takes about
+# an eighth of the memory, and neighboring cells are neighbors in memory as well.
+
+# the views use the memoryview.cast trick from arrays.py: casting the flat view to 'B' with shape [rows, cols] gives a
+# 2D memoryview that supports view[r, c]. A row is a contiguous slice of the flat view, and a column is the strided
+# slice flat[c::cols]: both share the grid's memory, nothing is copied. memoryview cannot describe a transposed
+# layout, so transpose() builds a new grid, using bytearray extended slices to copy each column in C.
+
+"""
+    >>> board = Grid(3, 3, '_')
+    >>> board[1, 2] = 'X'
+    >>> print(board)
+    ___
+    __X
+    ___
+    >>> bytes(board.column(2)), bytes(board.row(1))
+    (b'_X_', b'__X')
+    >>> board.fill('O', cols=slice(0, 1))
+    >>> print(board.transpose())
+    OOO
+    ___
+    _X_
+
+"""
+
+
+def _byte(value):
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = value.encode('latin-1')
+    (byte,) = value
+    return byte
+
+
+class Grid:
+
+    def __init__(self, rows, cols, fill=0):
+        self.rows = rows
+        self.cols = cols
+        self._data = bytearray([_byte(fill)]) * (rows * cols)
+        self._flat = memoryview(self._data)
+        # memoryview cannot cast to a shape with a zero in it: an empty grid gets an empty flat view, as in block()
+        self.view = self._flat.cast('B', [rows, cols]) if self._data else self._flat[0:0]
+
+    @classmethod
+    def frombytes(cls, rows, cols, octets):
+        if len(octets) != rows * cols:
+            raise ValueError(f'expected {rows * cols} bytes, got {len(octets)}')
+        grid = cls(rows, cols)
+        grid._data[:] = octets
+        return grid
+
+    def __len__(self):
+        return self.rows
+
+    def _offset(self, r, c):
+        if r < 0:
+            r += self.rows
+        if c < 0:
+            c += self.cols
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise IndexError('Grid index out of range')
+        return r * self.cols + c
+
+    # grid[r, c] is the byte value of one cell; grid[r] is a zero-copy view of row r
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            return self._data[self._offset(*index)]
+        return self.row(index)
+
+    def __setitem__(self, index, value):
+        self._data[self._offset(*index)] = _byte(value)
+
+    def row(self, r, start=None, stop=None):
+        row = self._flat[self._offset(r, 0):self._offset(r, 0) + self.cols]
+        return row[start:stop]
+
+    def column(self, c, start=None, stop=None):
+        return self._flat[self._offset(0, c)::self.cols][start:stop]
+
+    # rows start..stop as another 2D view over the same memory
+    def block(self, start, stop):
+        start, stop, _ = slice(start, stop).indices(self.rows)
+        if stop <= start or not self.cols:
+            # memoryview cannot cast to a shape with a zero in it
+            return self._flat[0:0]
+        return self._flat[start * self.cols:stop * self.cols].cast('B', [stop - start, self.cols])
+
+    # set a rectangle of cells (all of them by default) to value. Whole rows are one slice assignment, and columns
+    # use extended slice assignment on the bytearray: either way the loop runs in C
+    def fill(self, value, rows=slice(None), cols=slice(None)):
+        byte = _byte(value)
+        r_start, r_stop, r_step = rows.indices(self.rows)
+        c_start, c_stop, c_step = cols.indices(self.cols)
+        row_range, col_range = range(r_start, r_stop, r_step), range(c_start, c_stop, c_step)
+        if not row_range or not col_range:
+            return
+        if len(col_range) == self.cols and r_step == 1:
+            start, stop = row_range[0] * self.cols, (row_range[-1] + 1) * self.cols
+            self._data[start:stop] = bytes([byte]) * (stop - start)
+        elif len(row_range) == self.rows:
+            for c in col_range:
+                self._data[c::self.cols] = bytes([byte]) * self.rows
+        else:
+            # the same set of columns, walked left to right
+            first, step = min(col_range), abs(c_step)
+            run = bytes([byte]) * len(col_range)
+            for r in row_range:
+                base = r * self.cols + first
+                self._data[base:base + len(col_range) * step:step] = run
+
+    def transpose(self):
+        data, cols = self._data, self.cols
+        octets = b''.join(data[c::cols] for c in range(cols))
+        return type(self).frombytes(self.cols, self.rows, octets)
+
+    def count(self, value):
+        return self._data.count(_byte(value))
+
+    def __bytes__(self):
+        return bytes(self._data)
+
+    def __eq__(self, other):
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return (self.rows, self.cols) == (other.rows, other.cols) and self._data == other._data
+
+    def tolist(self):
+        if not self._data:
+            return [[] for _ in range(self.rows)]
+        return self.view.tolist()
+
+    def __str__(self):
+        if not self._data:
+            return '\n' * (self.rows - 1) if self.rows else ''
+        text = self._data.decode('latin-1')
+        return '\n'.join(text[i:i + self.cols] for i in range(0, len(text), self.cols))
+
+    def __repr__(self):
+        return f'{type(self).__name__}.frombytes({self.rows}, {self.cols}, {bytes(self._data)!r})'
+
+
+def main():
+    import sys
+    import tracemalloc
+
+    board = Grid(3, 3, '_')
+    board[1, 2] = 'X'
+    print(board)
+    print(board.view.tolist())
+
+    n = 1000
+    tracemalloc.start()
+    board = [['_'] * n for i in range(n)]
+    lists, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del board
+    tracemalloc.start()
+    grid = Grid(n, n, '_')
+    packed, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{n}x{n}: list of lists {lists / 2**20:.1f} MiB, Grid {packed / 2**20:.1f} MiB '
+          f'({lists / packed:.1f}x), getsizeof {sys.getsizeof(grid._data):,} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# check that every module in this package imports quickly and quietly
+
+# the examples used to run their demos at import time: importing arrays.py wrote an 80 MB file, and importing
+# tuples.py (to reuse metro_areas) printed half a page. Now every demo lives in main(), behind
+# if __name__ == '__main__', and modules that only need a heavy dependency in a few functions import it there.
+
+# python -X importtime reports, for every module imported, the time spent importing it and everything it imported
+# (the cumulative column, in microseconds). Each module is imported in a fresh interpreter, a few times, and the best
+# run is compared with its budget. A module fails if it goes over budget or writes anything to stdout.
+
+# usage: python import_time.py [module ...]    (exit status 1 if any module fails)
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# milliseconds, on top of interpreter startup
+BUDGET_MS = 25
+
+# these modules exist to drive NumPy, so importing NumPy is part of importing them
+ALLOWANCES_MS = {
+    'card_simulation': 400,
+    'memmap_matrix': 400,
+}
+
+
+def modules():
+    names = [name[:-3] for name in os.listdir(HERE) if name.endswith('.py')]
+    return sorted(name for name in names if name != 'import_time')
+
+
+# the cumulative import time of module in microseconds, and whatever it printed
+def measure(module):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=HERE, capture_output=True, text=True)
+    if result.returncode:
+        raise ImportError(f'{module}: {result.stderr.strip().splitlines()[-1]}')
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]), result.stdout
+    raise ValueError(f'{module}: not found in -X importtime output')
+
+
+def best_of(module, runs=3):
+    times, output = [], ''
+    for _ in range(runs):
+        micros, output = measure(module)
+        times.append(micros)
+    return min(times), output
+
+
+def main(argv=None):
+    names = (argv if argv is not None else sys.argv[1:]) or modules()
+    failures = 0
+    results = []
+    for name in names:
+        micros, output = best_of(name)
+        results.append((micros, name, output))
+    for micros, name, output in sorted(results, reverse=True):
+        budget = ALLOWANCES_MS.get(name, BUDGET_MS)
+        status = 'ok'
+        if micros > budget * 1000:
+            status = 'OVER BUDGET'
+        elif output:
+            status = f'PRINTS {len(output.splitlines())} lines'
+        failures += status != 'ok'
+        print(f'{name:24} {micros / 1000:8.1f} ms  (budget {budget:4} ms)  {status}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+# where do the time and the memory go? Named sections for the demo workloads
+
+# wrap a block in `with section('name'):`, or a function in @profiled(), and every run of it is recorded: wall time
+# (perf_counter), CPU time (process_time), the tracemalloc peak reached inside the section, the net bytes it left
+# allocated, and the net number of memory blocks it left allocated (sys.getallocatedblocks).
+
+# instrumentation is off by default. Then section() returns one shared object whose __enter__ and __exit__ do nothing,
+# and a @profiled function costs a single global lookup per call, so the annotations can stay in the demo code.
+# enable() turns it on and sends every record (a dict) to a sink: any object with a record(entry) method.
+# Aggregator keeps per-section totals in memory and prints a ranked report; JsonLinesSink writes one JSON object per
+# line, for later analysis.
+
+# tracemalloc makes allocations several times slower, so the wall times of a run with memory=True are inflated;
+# use memory=False (--no-memory on the command line) to time the code as it normally runs.
+
+# usage: python instrument.py [--jsonl PATH] [--no-memory] [--sort wall|cpu|peak|blocks] module
+# imports module, runs its main() with instrumentation on, and prints the hot sections, slowest first.
+
+"""
+    >>> sink = enable(memory=False)
+    >>> with section('outer'):
+    ...     with section('inner'):
+    ...         squares = [n * n for n in range(1000)]
+    >>> disable() is sink
+    True
+    >>> sorted(sink.totals)
+    ['outer', 'outer/inner']
+    >>> sink.totals['outer/inner']['calls']
+    1
+
+"""
+
+import functools
+import sys
+from time import perf_counter, process_time
+
+_sink = None
+_stack = []
+_memory = False
+_started_tracemalloc = False
+
+
+class _NullSection:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL = _NullSection()
+
+
+class _Section:
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        parent = _stack[-1] if _stack else None
+        self.path = f'{parent.path}/{self.name}' if parent else self.name
+        if _memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            # reset_peak starts a new peak for this section; the peak reached so far belongs to the parent
+            if parent:
+                parent.highest = max(parent.highest, peak)
+            tracemalloc.reset_peak()
+            self.start_bytes = self.highest = current
+        _stack.append(self)
+        self.blocks = sys.getallocatedblocks()
+        self.cpu = process_time()
+        self.wall = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = perf_counter() - self.wall
+        cpu = process_time() - self.cpu
+        blocks = sys.getallocatedblocks() - self.blocks
+        _stack.pop()
+        entry = {'section': self.path, 'wall': wall, 'cpu': cpu, 'blocks': blocks}
+        if _memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            self.highest = max(self.highest, peak)
+            entry['peak'] = self.highest - self.start_bytes
+            entry['net'] = current - self.start_bytes
+            if _stack:
+                _stack[-1].highest = max(_stack[-1].highest, self.highest)
+        if _sink is not None:
+            _sink.record(entry)
+        return False
+
+
+def section(name):
+    if _sink is None:
+        return _NULL
+    return _Section(name)
+
+
+# decorator: every call of the function is a section, named after the function unless a name is given.
+# Whether to record is decided at call time, so functions decorated at import time can be profiled later
+def profiled(name=None):
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _sink is None:
+                return func(*args, **kwargs)
+            with _Section(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class Aggregator:
+
+    def __init__(self):
+        self.totals = {}
+
+    def record(self, entry):
+        totals = self.totals.get(entry['section'])
+        if totals is None:
+            totals = self.totals[entry['section']] = {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'blocks': 0, 'peak': 0}
+        totals['calls'] += 1
+        totals['wall'] += entry['wall']
+        totals['cpu'] += entry['cpu']
+        totals['blocks'] += entry['blocks']
+        totals['peak'] = max(totals['peak'], entry.get('peak', 0))
+
+    # sections ranked by key (wall, cpu, peak or blocks), largest first
+    def ranked(self, key='wall'):
+        return sorted(self.totals.items(), key=lambda item: item[1][key], reverse=True)
+
+    def report(self, key='wall', limit=None, file=None):
+        file = file or sys.stdout
+        print(f'{"section":40} {"calls":>7} {"wall s":>9} {"cpu s":>9} {"peak MiB":>9} {"net blocks":>11}', file=file)
+        for name, totals in self.ranked(key)[:limit]:
+            print(f'{name:40} {totals["calls"]:7,} {totals["wall"]:9.4f} {totals["cpu"]:9.4f} '
+                  f'{totals["peak"] / 2**20:9.2f} {totals["blocks"]:11,}', file=file)
+
+
+class JsonLinesSink:
+
+    def __init__(self, path):
+        import json
+
+        self._dumps = json.dumps
+        self._fp = open(path, 'a')
+
+    def record(self, entry):
+        self._fp.write(self._dumps(entry) + '\n')
+
+    def close(self):
+        self._fp.close()
+
+
+# send every record to several sinks, i.e. an Aggregator for the report and a JsonLinesSink for the log
+class Tee:
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def record(self, entry):
+        for sink in self.sinks:
+            sink.record(entry)
+
+    def close(self):
+        for sink in self.sinks:
+            if hasattr(sink, 'close'):
+                sink.close()
+
+
+# tracemalloc imports pickle and re, so it is only imported once memory tracing is asked for: importing instrument
+# has to stay cheap, because the demo modules import it
+def enable(sink=None, memory=True):
+    import tracemalloc
+
+    global _sink, _memory, _started_tracemalloc
+    if sink is None:
+        sink = Aggregator()
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _sink = sink
+    return sink
+
+
+# turn instrumentation off and return the sink, which keeps everything recorded so far
+def disable():
+    global _sink, _memory, _started_tracemalloc
+    sink, _sink = _sink, None
+    if _started_tracemalloc:
+        import tracemalloc
+
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    _memory = False
+    _stack.clear()
+    return sink
+
+
+def main(argv=None):
+    import argparse
+    import importlib
+
+    parser = argparse.ArgumentParser(description="run a module's main() and report where the time and memory go")
+    parser.add_argument('module')
+    parser.add_argument('--jsonl', help='also append every record to this JSON lines file')
+    parser.add_argument('--no-memory', action='store_true', help='do not trace allocations with tracemalloc')
+    parser.add_argument('--sort', default='wall', choices=['wall', 'cpu', 'peak', 'blocks'])
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(args.module)
+    aggregator = Aggregator()
+    sink = Tee(aggregator, JsonLinesSink(args.jsonl)) if args.jsonl else aggregator
+    enable(sink, memory=not args.no_memory)
+    try:
+        with section(f'{args.module}.main'):
+            module.main()
+    finally:
+        disable()
+        if args.jsonl:
+            sink.close()
+    print()
+    aggregator.report(args.sort, args.limit)
+
+
+if __name__ == '__main__':
+    # run as a script, this file is __main__, while the profiled module imports section from instrument: call main()
+    # through that module, so that both share one sink
+    import instrument
+
+    instrument.main()
@@ -0,0 +1,152 @@
+# the numpy_demo.py operations (reshape, rows, columns, transpose) on packed-double files too big for memory
+
+# arrays.py writes floats with array.tofile: a raw run of 8-byte doubles, no header. numpy.memmap maps such a file
+# into memory like mmap does, and presents it as an ndarray: giving it a (rows, cols) shape is the out-of-core
+# version of a.shape = 3, 4. Indexing a row or a block of rows only reads those pages from disk.
+
+# a column, a[:, 1], touches every row, so it would touch every page of the file. Reductions over columns are done
+# block by block instead: each block of rows is read sequentially, reduced with a NumPy ufunc, and combined into
+# the running result, so memory use is bounded by the block size whatever the size of the file.
+
+# the standard deviation is not computed as E[x**2] - mean**2: for data with a large mean (timestamps, say) the two
+# terms agree in almost every digit and the difference is rounding noise. Each block gets its own mean and sum of
+# squared deviations, and the blocks are merged with Chan's parallel update of Welford's algorithm.
+
+# a.transpose() on a memmap returns a view with swapped strides, and reading it in order jumps all over the file.
+# transpose_to writes the transpose to a new file tile by tile. Tiles are square-ish, about block_bytes each, so both
+# the runs read from a row of the input and the runs written to a row of the output are one tile wide: with 64 MiB
+# tiles, runs of about 23 KB. Blocking by rows alone would write only `block rows` items to every one of the output
+# rows, which for a wide matrix means millions of tiny scattered writes. A narrow matrix gets tall tiles instead, as
+# wide as the matrix. Tiles go along a band of rows, left to right, so the input is still read front to back.
+
+import math
+import os
+
+import numpy as np
+
+
+def open_matrix(path, cols, dtype='d', mode='r'):
+    itemsize = np.dtype(dtype).itemsize
+    rows = os.path.getsize(path) // (itemsize * cols)
+    return np.memmap(path, dtype=dtype, mode=mode, shape=(rows, cols))
+
+
+# rows per block so that one block takes about block_bytes of memory
+def _block_rows(matrix, block_bytes):
+    return max(1, block_bytes // (matrix.shape[1] * matrix.itemsize))
+
+
+def iter_blocks(matrix, block_bytes=64 * 2**20):
+    step = _block_rows(matrix, block_bytes)
+    for start in range(0, matrix.shape[0], step):
+        yield start, np.asarray(matrix[start:start + step])
+
+
+# reduce each column with a ufunc such as np.add, np.minimum or np.maximum, one block of rows at a time
+def reduce_columns(matrix, ufunc=np.add, block_bytes=64 * 2**20):
+    result = None
+    for _, block in iter_blocks(matrix, block_bytes):
+        partial = ufunc.reduce(block, axis=0)
+        result = partial if result is None else ufunc(result, partial)
+    return result
+
+
+# sum, mean, min, max and standard deviation of every column in a single sequential pass
+def column_stats(matrix, block_bytes=64 * 2**20):
+    rows, cols = matrix.shape
+    total = np.zeros(cols)
+    mean = np.zeros(cols)
+    m2 = np.zeros(cols)  # sum of squared deviations from the mean
+    low = np.full(cols, np.inf)
+    high = np.full(cols, -np.inf)
+    seen = 0
+    for _, block in iter_blocks(matrix, block_bytes):
+        n = len(block)
+        block_mean = block.mean(axis=0)
+        block_m2 = np.square(block - block_mean).sum(axis=0)
+        # Chan et al.: merge (seen, mean, m2) with the statistics of the block
+        delta = block_mean - mean
+        seen += n
+        mean += delta * (n / seen)
+        m2 += block_m2 + delta**2 * ((seen - n) * n / seen)
+        total += block.sum(axis=0)
+        np.minimum(low, block.min(axis=0), out=low)
+        np.maximum(high, block.max(axis=0), out=high)
+    if not rows:
+        mean[:] = np.nan
+    std = np.sqrt(m2 / rows) if rows else np.full(cols, np.nan)
+    return {'sum': total, 'mean': mean, 'min': low, 'max': high, 'std': std}
+
+
+# the (rows, cols) shape of the tiles of transpose_to: about block_bytes each, square unless the matrix is too narrow
+# or too short for that
+def _tile_shape(matrix, block_bytes):
+    rows, cols = matrix.shape
+    items = max(1, block_bytes // matrix.itemsize)
+    tile_cols = max(1, min(cols, math.isqrt(items)))
+    tile_rows = max(1, min(rows, items // tile_cols))
+    tile_cols = max(1, min(cols, items // tile_rows))
+    return tile_rows, tile_cols
+
+
+# write matrix.T to out_path as another packed file, with (cols, rows) shape
+def transpose_to(matrix, out_path, block_bytes=64 * 2**20):
+    rows, cols = matrix.shape
+    out = np.memmap(out_path, dtype=matrix.dtype, mode='w+', shape=(cols, rows))
+    tile_rows, tile_cols = _tile_shape(matrix, block_bytes)
+    for top in range(0, rows, tile_rows):
+        for left in range(0, cols, tile_cols):
+            tile = matrix[top:top + tile_rows, left:left + tile_cols]
+            out[left:left + tile_cols, top:top + tile_rows] = tile.T
+    out.flush()
+    del out
+    return open_matrix(out_path, rows, matrix.dtype)
+
+
+def benchmark(rows=10**6, cols=16, path='floats.bin'):
+    from time import perf_counter
+
+    if not os.path.exists(path):
+        np.random.default_rng(0).random(rows * cols).tofile(path)
+    size = os.path.getsize(path)
+
+    t0 = perf_counter()
+    whole = np.fromfile(path, dtype='d')
+    whole = whole[:whole.size // cols * cols].reshape(-1, cols)
+    expected = whole.sum(axis=0)
+    loaded = perf_counter() - t0
+    del whole
+
+    matrix = open_matrix(path, cols)
+    t0 = perf_counter()
+    sums = reduce_columns(matrix, block_bytes=16 * 2**20)
+    blocked = perf_counter() - t0
+    assert np.allclose(sums, expected)
+    print(f'column sums over {size / 2**20:.0f} MiB: load whole file {size / loaded / 2**20:.0f} MiB/s, '
+          f'memmap blocks {size / blocked / 2**20:.0f} MiB/s')
+
+    t0 = perf_counter()
+    transposed = transpose_to(matrix, path + '.T', block_bytes=16 * 2**20)
+    elapsed = perf_counter() - t0
+    assert np.array_equal(transposed[:, -1], matrix[-1])
+    print(f'tiled transpose: {size / elapsed / 2**20:.0f} MiB/s')
+    del transposed
+    os.remove(path + '.T')
+
+
+def main():
+    # the numpy_demo.py steps on a 12-double file
+    np.arange(12, dtype='d').tofile('demo.bin')
+    a = open_matrix('demo.bin', 4)
+    print(a)
+    print(a[2], a[2, 1], a[:, 1])
+    print(column_stats(a))
+    print(transpose_to(a, 'demo.T.bin'))
+    del a
+    os.remove('demo.bin')
+    os.remove('demo.T.bin')
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,34 +1,42 @@
 # a brief numpy demo from the Data Structures chapter of Fluent Python by Luciano Ramalho
 
-# import NumPy after installing it (which my IDE did automatically).
-# numpy is usually imported as np
-import numpy as np
 
-# the following is a demonstration of basic operations with 2d arrays
+# importing NumPy takes far longer than any other module in this package, so it is imported when the demo runs,
+# not when numpy_demo is imported
+def main():
+    # import NumPy after installing it (which my IDE did automatically).
+    # numpy is usually imported as np
+    import numpy as np
 
-# build and inspect a numpy.ndarray with integers 0 to 11
-a = np.arange(12)
-print(a)
+    # the following is a demonstration of basic operations with 2d arrays
 
-# inspect the dimensions of the array: this is a one-dimensional, 12 element array
-print(a.shape)
-# prints (12,)
+    # build and inspect a numpy.ndarray with integers 0 to 11
+    a = np.arange(12)
+    print(a)
 
-# add one dimension to the array, then inspect result
-a.shape = 3, 4
-print(a)
+    # inspect the dimensions of the array: this is a one-dimensional, 12 element array
+    print(a.shape)
+    # prints (12,)
 
-print('\n')
-# get row at index 2
-print(a[2])
+    # add one dimension to the array, then inspect result
+    a.shape = 3, 4
+    print(a)
 
-print('\n')
-# get element at index 2, 1
-print(a[2, 1])
+    print('\n')
+    # get row at index 2
+    print(a[2])
 
-print('\n')
-# get column at index 1
-print(a[:, 1])
+    print('\n')
+    # get element at index 2, 1
+    print(a[2, 1])
 
-# create a new array by transposing (swapping columns with rows)
-print(a.transpose())
+    print('\n')
+    # get column at index 1
+    print(a[:, 1])
+
+    # create a new array by transposing (swapping columns with rows)
+    print(a.transpose())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+# a table-driven poker hand evaluator for the cards of dunder_examples.py
+
+# sorting a hand with spades_high orders the cards; it cannot say that a pair of twos beats ace-king high. Here a hand
+# of 5 to 7 cards gets an int value: the better the hand, the larger the value. The category (pair, flush...) is in
+# the high bits and the ranks that break ties are packed below it, 4 bits each, most important first.
+
+# cards are the int codes of Card.code: suit * 13 + rank, with rank 0 for a 2 and 12 for an ace. Scoring a hand
+# takes a few table lookups and no branching on the kind of hand:
+
+# a flush only depends on which ranks the suit holds, a 13-bit mask, so flush_table has 8192 entries, one per mask: the
+# best flush or straight flush among those ranks, or 0 when there are fewer than five. With 7 cards, a flush
+# beats anything that is not a straight flush (quads or a full house would need at least 3 cards outside the flush
+# suit), so the best of the four suit masks wins whenever it is not 0.
+
+# everything else only depends on the multiset of ranks. A sorted multiset r0 <= r1 <= ... <= rk-1 of k ranks
+# becomes the strictly increasing r0 < r1+1 < r2+2 ..., and the combinatorial number system maps that to a unique
+# index: sum(comb(ri + i, i + 1)). That is a minimal perfect hash onto 0..comb(12 + k, k) - 1, so the tables have
+# comb(17, 5) = 6188 entries for 5 cards and comb(19, 7) = 50388 for 7, with no collisions and no gaps. The tables
+# are built on first use.
+
+# evaluate_batch scores a NumPy array of hands, one per row, with the same tables: sorting networks sort the ranks
+# column by column, and both lookups become fancy indexing over whole columns.
+
+"""
+    >>> from dunder_examples import Card
+    >>> royal = [Card.of(rank, 'hearts') for rank in 'AKQJ'] + [Card.of('10', 'hearts')]
+    >>> describe(evaluate(royal))
+    'straight flush'
+    >>> wheel = [Card.of('A', 'spades'), Card.of('2', 'hearts'), Card.of('3', 'clubs'), Card.of('4', 'spades'),
+    ...          Card.of('5', 'diamonds')]
+    >>> describe(evaluate(wheel)), evaluate(wheel) < evaluate(wheel[1:] + [Card.of('6', 'clubs')])
+    ('straight', True)
+    >>> twos = [Card.of('2', 'spades'), Card.of('2', 'hearts'), Card.of('5', 'clubs'), Card.of('7', 'spades'),
+    ...         Card.of('9', 'diamonds')]
+    >>> ace_king = [Card.of('A', 'spades'), Card.of('K', 'hearts'), Card.of('5', 'clubs'), Card.of('7', 'spades'),
+    ...             Card.of('9', 'diamonds')]
+    >>> evaluate(twos) > evaluate(ace_king)
+    True
+    >>> describe(evaluate(twos + [Card.of('2', 'clubs'), Card.of('9', 'hearts')]))
+    'full house'
+
+"""
+
+import functools
+from array import array
+from itertools import combinations, combinations_with_replacement
+from math import comb
+
+from dunder_examples import CARD_CODES
+
+CATEGORIES = ['high card', 'pair', 'two pair', 'three of a kind', 'straight', 'flush', 'full house', 'four of a kind',
+              'straight flush']
+(HIGH_CARD, PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND,
+ STRAIGHT_FLUSH) = range(len(CATEGORIES))
+
+RANKS = 13
+# up to five tie-breaking ranks of 4 bits each sit below the category
+CATEGORY_SHIFT = 20
+# A, 2, 3, 4, 5: the ace plays low
+WHEEL = 1 << 12 | 0b1111
+
+# the number of 5-card hands in each category, out of comb(52, 5) = 2,598,960
+FIVE_CARD_COUNTS = [1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 40]
+
+# _COMBINADIC[i][r] = comb(r + i, i + 1): the term of the i-th smallest rank in the index of a multiset
+_COMBINADIC = [[comb(rank + i, i + 1) for rank in range(RANKS)] for i in range(7)]
+
+# sorting networks: compare and swap these pairs of positions, in order, and any input ends up sorted
+SORTING_NETWORKS = {
+    5: [(0, 1), (3, 4), (2, 4), (2, 3), (1, 4), (0, 3), (0, 2), (1, 3), (1, 2)],
+    6: [(1, 2), (4, 5), (0, 2), (3, 5), (0, 1), (3, 4), (2, 5), (0, 3), (1, 4), (2, 4), (1, 3), (2, 3)],
+    7: [(1, 2), (3, 4), (5, 6), (0, 2), (3, 5), (4, 6), (0, 1), (4, 5), (2, 6), (0, 4), (1, 5), (0, 3), (2, 5),
+        (1, 3), (2, 4), (2, 3)],
+}
+
+
+def _value(category, ranks):
+    value = category
+    for i in range(5):
+        value = value << 4 | (ranks[i] if i < len(ranks) else 0)
+    return value
+
+
+def category(value):
+    return value >> CATEGORY_SHIFT
+
+
+def describe(value):
+    return CATEGORIES[category(value)]
+
+
+# the top rank of the best straight in a rank mask, or None
+def _straight_top(mask):
+    for top in range(RANKS - 1, 3, -1):
+        if mask >> (top - 4) & 0b11111 == 0b11111:
+            return top
+    if mask & WHEEL == WHEEL:
+        return 3
+    return None
+
+
+def _score_flush(mask):
+    if mask.bit_count() < 5:
+        return 0
+    top = _straight_top(mask)
+    if top is not None:
+        return _value(STRAIGHT_FLUSH, [top])
+    return _value(FLUSH, [rank for rank in reversed(range(RANKS)) if mask >> rank & 1][:5])
+
+
+# the best 5-card hand, flushes aside, that can be made from a multiset of 5 to 7 ranks
+def _score_ranks(ranks):
+    counts = [0] * RANKS
+    for rank in ranks:
+        counts[rank] += 1
+    if max(counts) > 4:
+        return 0
+    # (count, rank) pairs, largest count first and highest rank first among equal counts
+    groups = sorted(((count, rank) for rank, count in enumerate(counts) if count), reverse=True)
+    distinct = [rank for rank in reversed(range(RANKS)) if counts[rank]]
+    (top_count, top), second_count = groups[0], groups[1][0] if len(groups) > 1 else 0
+    if top_count == 4:
+        return _value(FOUR_OF_A_KIND, [top] + [rank for rank in distinct if rank != top][:1])
+    if top_count == 3 and second_count >= 2:
+        return _value(FULL_HOUSE, [top, groups[1][1]])
+    straight = _straight_top(sum(1 << rank for rank in distinct))
+    if straight is not None:
+        return _value(STRAIGHT, [straight])
+    if top_count == 3:
+        return _value(THREE_OF_A_KIND, [top] + [rank for rank in distinct if rank != top][:2])
+    if top_count == 2 and second_count == 2:
+        pairs = [top, groups[1][1]]
+        return _value(TWO_PAIR, pairs + [rank for rank in distinct if rank not in pairs][:1])
+    if top_count == 2:
+        return _value(PAIR, [top] + [rank for rank in distinct if rank != top][:3])
+    return _value(HIGH_CARD, distinct[:5])
+
+
+def rank_index(sorted_ranks):
+    return sum(terms[rank] for terms, rank in zip(_COMBINADIC, sorted_ranks))
+
+
+@functools.cache
+def flush_table():
+    return array('i', (_score_flush(mask) for mask in range(1 << RANKS)))
+
+
+# the value of every multiset of `cards` ranks, at its rank_index
+@functools.cache
+def rank_table(cards):
+    table = array('i', [0]) * comb(RANKS - 1 + cards, cards)
+    for ranks in combinations_with_replacement(range(RANKS), cards):
+        table[rank_index(ranks)] = _score_ranks(ranks)
+    return table
+
+
+def evaluate_codes(codes):
+    suit_masks = [0, 0, 0, 0]
+    ranks = []
+    for code in codes:
+        if not 0 <= code < 4 * RANKS:
+            raise ValueError(f'card codes are 0 to 51, not {code}')
+        suit, rank = divmod(code, RANKS)
+        suit_masks[suit] |= 1 << rank
+        ranks.append(rank)
+    if not 5 <= len(ranks) <= 7:
+        raise ValueError(f'a hand has 5 to 7 cards, not {len(ranks)}')
+    flushes = flush_table()
+    best_flush = max(flushes[mask] for mask in suit_masks)
+    if best_flush:
+        return best_flush
+    ranks.sort()
+    return rank_table(len(ranks))[rank_index(ranks)]
+
+
+# a hand of Cards (or of int codes)
+def evaluate(hand):
+    return evaluate_codes(card if isinstance(card, int) else CARD_CODES[card] for card in hand)
+
+
+@functools.cache
+def _numpy_tables():
+    import numpy as np
+
+    codes = np.arange(4 * RANKS)
+    ranks, suits = codes % RANKS, codes // RANKS
+    return {
+        # the rank in the low byte, and a 1 in the 4-bit counter of the suit, in bits 8..23. Adding up the packed
+        # words of a hand counts the cards of every suit at once: the ranks add up to at most 7 * 12 < 256, so they
+        # never spill into the counters
+        'packed': (ranks | 1 << (8 + 4 * suits)).astype(np.int32),
+        # every card sets one bit in a 64-bit word: bits 0..12 for the first suit, 16..28 for the next, and so on
+        'bit': np.uint64(1) << (suits * 16 + ranks).astype(np.uint64),
+        'combinadic': [np.array(terms, dtype=np.int32) for terms in _COMBINADIC],
+        'flush': np.frombuffer(flush_table(), dtype=np.int32),
+        'ranks': {cards: np.frombuffer(rank_table(cards), dtype=np.int32) for cards in SORTING_NETWORKS},
+    }
+
+
+def _evaluate_block(np, tables, hands):
+    k = hands.shape[1]
+    # one contiguous row per card position, so every step below runs over whole columns
+    packed = [tables['packed'].take(column, mode='clip') for column in np.ascontiguousarray(hands.T)]
+    # casting to int8 keeps the low byte: the rank
+    ranks = [word.astype(np.int8) for word in packed]
+    for i, j in SORTING_NETWORKS[k]:
+        ranks[i], ranks[j] = np.minimum(ranks[i], ranks[j]), np.maximum(ranks[i], ranks[j])
+    # comb(r, 1) is r itself
+    index = ranks[0].astype(np.int32)
+    for i in range(1, k):
+        index += tables['combinadic'][i].take(ranks[i], mode='clip')
+    values = tables['ranks'][k].take(index, mode='clip')
+
+    # adding 3 to a suit counter (at most 7) sets its top bit exactly when the suit has 5 cards or more
+    counters = sum(packed[1:], packed[0]) >> 8
+    flushes = np.flatnonzero((counters + 0x3333) & 0x8888)
+    if len(flushes):
+        bits = np.bitwise_or.reduce(tables['bit'][hands[flushes].astype(np.intp)], axis=1)
+        best = np.zeros(len(flushes), dtype=np.int32)
+        for suit in range(4):
+            mask = ((bits >> np.uint64(16 * suit)) & np.uint64(0x1FFF)).astype(np.intp)
+            np.maximum(best, tables['flush'][mask], out=best)
+        values[flushes] = best
+    return values
+
+
+# hands is an (n, k) array of card codes (0..51), 5 <= k <= 7, with one hand per row. Returns the n values as int32.
+# The hands are scored in blocks of `block` rows, so that the temporary columns stay in the CPU cache. The codes are
+# checked once up front: the gathers use mode='clip', which would quietly turn 52 or -1 into a valid card
+def evaluate_batch(hands, block=2**16):
+    import numpy as np
+
+    hands = np.asarray(hands)
+    k = hands.shape[1]
+    if k not in SORTING_NETWORKS:
+        raise ValueError(f'a hand has 5 to 7 cards, not {k}')
+    if hands.size and ((hands < 0) | (hands > 4 * RANKS - 1)).any():
+        raise ValueError('card codes are 0 to 51')
+    tables = _numpy_tables()
+    values = np.empty(len(hands), dtype=np.int32)
+    for start in range(0, len(hands), block):
+        values[start:start + block] = _evaluate_block(np, tables, hands[start:start + block])
+    return values
+
+
+# every 5-card hand, as an (n, 5) int8 array of codes in lexicographic order
+def all_hands(cards=5):
+    import numpy as np
+
+    count = comb(4 * RANKS, cards)
+    codes = np.fromiter((code for hand in combinations(range(4 * RANKS), cards) for code in hand),
+                        dtype=np.int8, count=count * cards)
+    return codes.reshape(count, cards)
+
+
+# evaluate all 2,598,960 five-card hands in batch, and check the count of every category and the number of
+# distinct values (7462 classes of equivalent hands); a sample is also checked against evaluate_codes
+def verify_exhaustive(sample=10**4):
+    import numpy as np
+
+    hands = all_hands(5)
+    values = evaluate_batch(hands)
+    counts = np.bincount(values >> CATEGORY_SHIFT, minlength=len(CATEGORIES)).tolist()
+    if counts != FIVE_CARD_COUNTS:
+        raise AssertionError(f'category counts {counts}, expected {FIVE_CARD_COUNTS}')
+    distinct = len(np.unique(values))
+    if distinct != 7462:
+        raise AssertionError(f'{distinct} distinct hand values, expected 7462')
+    rng = np.random.default_rng(0)
+    for row in rng.choice(len(hands), sample, replace=False):
+        if evaluate_codes(hands[row].tolist()) != values[row]:
+            raise AssertionError(f'batch and scalar values differ for hand {hands[row].tolist()}')
+    return dict(zip(CATEGORIES, counts))
+
+
+# 6- and 7-card hands against the definition: the best of their 5-card subsets
+def verify_sample(cards=7, sample=10**4, seed=0):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    hands = np.argsort(rng.random((sample, 4 * RANKS)), axis=1)[:, :cards]
+    values = evaluate_batch(hands)
+    for hand, value in zip(hands.tolist(), values.tolist()):
+        best = max(evaluate_codes(five) for five in combinations(hand, 5))
+        if evaluate_codes(hand) != best or value != best:
+            raise AssertionError(f'wrong value for hand {hand}')
+    return sample
+
+
+def benchmark(hands=10**6):
+    from time import perf_counter
+
+    import numpy as np
+
+    from card_simulation import deal_hands
+
+    rng = np.random.default_rng(1)
+    for cards in (5, 7):
+        evaluate_batch(deal_hands(rng, 1, cards))
+        dealt = deal_hands(rng, -(-hands // (52 // cards)), cards)[:hands]
+        elapsed = []
+        for _ in range(3):
+            t0 = perf_counter()
+            values = evaluate_batch(dealt)
+            elapsed.append(perf_counter() - t0)
+        batch = len(dealt) / min(elapsed)
+
+        few = dealt[:hands // 100].tolist()
+        t0 = perf_counter()
+        for hand in few:
+            evaluate_codes(hand)
+        scalar = len(few) / (perf_counter() - t0)
+        shares = np.bincount(values >> CATEGORY_SHIFT, minlength=len(CATEGORIES)) / len(values)
+        print(f'{cards} cards: batch {batch:14,.0f} hands/s, one at a time {scalar:12,.0f} hands/s; '
+              f'{describe(int(values.max()))} in {shares[-1]:.4%} of hands')
+
+
+def main():
+    from random import sample
+
+    from dunder_examples import FrenchDeck, spades_high
+
+    deck = FrenchDeck()
+    for _ in range(3):
+        hand = sample(list(deck), 7)
+        print(sorted(hand, key=spades_high), '->', describe(evaluate(hand)))
+    print(verify_exhaustive())
+    print(verify_sample(7), 'seven-card hands checked against their 5-card subsets')
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+# a lazy, random-access view of a Cartesian product, like the tshirts example in list_comprehension.py
+
+# [(color, size) for color in colors for size in sizes] builds every combination up front: with catalog dimensions
+# that multiply into billions of SKUs, that list would not fit in memory. A genexp avoids building the list but can
+# only go forward: there is no way to jump to the millionth combination, ask how many there are, or find the position
+# of a given combination.
+
+# a Cartesian product has a simple arithmetic structure, like the digits of a number. With dimensions of lengths
+# 2 and 3, combination n is (colors[n // 3], sizes[n % 3]). ProductView computes items on demand from that rule, so
+# len is O(1) and __getitem__ and index are O(number of dimensions). Nothing but the dimensions is ever stored.
+
+# `order` says which dimension varies slowest, like the order of the for clauses in a listcomp: the default is the
+# order of the arguments (color-major), and order=(1, 0) gives the size-major listing from list_comprehension.py.
+# The tuples always list their fields in argument order, i.e. (color, size).
+
+# slices are views too: they keep a range of positions, and range slicing is itself O(1).
+
+"""
+    >>> colors = ['black', 'white']
+    >>> sizes = ['S', 'M', 'L']
+    >>> tshirts = ProductView(colors, sizes)
+    >>> len(tshirts), tshirts[4]
+    (6, ('white', 'M'))
+    >>> list(tshirts) == [(color, size) for color in colors for size in sizes]
+    True
+    >>> by_size = ProductView(colors, sizes, order=(1, 0))
+    >>> list(by_size) == [(color, size) for size in sizes for color in colors]
+    True
+    >>> by_size.index(('white', 'M'))
+    3
+    >>> skus = ProductView(range(10**6), range(10**6), 'ABC')
+    >>> len(skus), skus[-1]
+    (3000000000000, (999999, 999999, 'C'))
+    >>> page = skus[10**9:][::10**6]
+    >>> len(page), page[1], page.index((333, 666666, 'C'))
+    (2999000, (333, 666666, 'C'), 1)
+
+"""
+
+import itertools
+from collections import abc
+
+
+class ProductView(abc.Sequence):
+
+    def __init__(self, *dimensions, order=None):
+        # sequences such as range are kept as they are: range(10**9) must not be turned into a tuple
+        self._dimensions = tuple(dimension if isinstance(dimension, abc.Sequence) else tuple(dimension)
+                                 for dimension in dimensions)
+        if order is None:
+            order = range(len(self._dimensions))
+        self._order = tuple(order)
+        if sorted(self._order) != list(range(len(self._dimensions))):
+            raise ValueError('order must be a permutation of the dimension numbers')
+        # stride of each dimension: how many positions one step in that dimension skips
+        self._strides = [0] * len(self._dimensions)
+        stride = 1
+        for axis in reversed(self._order):
+            self._strides[axis] = stride
+            stride *= len(self._dimensions[axis])
+        self._total = stride
+        self._range = range(stride)
+        self._positions = [None] * len(self._dimensions)
+
+    # a view over a subrange of positions, sharing everything else with self
+    def _with_range(self, positions):
+        view = object.__new__(type(self))
+        view.__dict__.update(self.__dict__)
+        view._range = positions
+        return view
+
+    def __len__(self):
+        return len(self._range)
+
+    def _combination(self, n):
+        return tuple(dimension[n // stride % len(dimension)]
+                     for dimension, stride in zip(self._dimensions, self._strides))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._with_range(self._range[index])
+        return self._combination(self._range[index])
+
+    def __iter__(self):
+        if self._range == range(self._total) and self._order == tuple(range(len(self._dimensions))):
+            # the whole product in argument order is exactly what itertools.product yields, at C speed
+            return itertools.product(*self._dimensions)
+        return map(self._combination, self._range)
+
+    def __reversed__(self):
+        return map(self._combination, reversed(self._range))
+
+    def __repr__(self):
+        dimensions = ', '.join(map(repr, self._dimensions))
+        r = self._range
+        return f'{type(self).__name__}({dimensions}, order={self._order!r})[{r.start}:{r.stop}:{r.step}]'
+
+    # map each value of a dimension to its position, built on the first index() call for that dimension
+    def _position(self, axis, value):
+        dimension = self._dimensions[axis]
+        if isinstance(dimension, range):
+            # range.index is already O(1)
+            return dimension.index(value)
+        positions = self._positions[axis]
+        if positions is None:
+            try:
+                positions = {}
+                for i, item in enumerate(dimension):
+                    positions.setdefault(item, i)
+            except TypeError:
+                # unhashable values: fall back to a linear search of this dimension
+                return dimension.index(value)
+            self._positions[axis] = positions
+        try:
+            return positions[value]
+        except (KeyError, TypeError):
+            raise ValueError(f'{value!r} is not in dimension {axis}') from None
+
+    def index(self, combination, start=0, stop=None):
+        if len(combination) != len(self._dimensions):
+            raise ValueError(f'{combination!r} is not in {type(self).__name__}')
+        n = sum(self._position(axis, value) * stride
+                for axis, (value, stride) in enumerate(zip(combination, self._strides)))
+        try:
+            i = self._range.index(n)
+        except ValueError:
+            raise ValueError(f'{combination!r} is not in {type(self).__name__}') from None
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if not start <= i < stop:
+            raise ValueError(f'{combination!r} is not in {type(self).__name__}')
+        return i
+
+    def __contains__(self, combination):
+        try:
+            self.index(combination)
+        except ValueError:
+            return False
+        return True
+
+    # assumes that each dimension holds distinct values, so every combination appears at most once
+    def count(self, combination):
+        return int(combination in self)
+
+
+def main():
+    from list_comprehension import colors, sizes
+
+    tshirts = ProductView(colors, sizes)
+    print(list(tshirts))
+    print(list(ProductView(colors, sizes, order=(1, 0))))
+    skus = ProductView(range(10**4), colors, sizes, range(10**5))
+    print(f'{len(skus):,} SKUs, #123,456,789 is {skus[123_456_789]}, '
+          f'found back at {skus.index(skus[123_456_789]):,}')
+    page = skus[10**9:10**9 + 5]
+    print(list(page))
+
+
+if __name__ == '__main__':
+    main()
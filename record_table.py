@@ -0,0 +1,252 @@
+# a columnar store for tuple records like metro_areas in tuples.py
+
+# tuples.main filters metro_areas by unpacking every nested tuple in a Python loop. That is fine for five cities; for
+# millions of rows, every row costs a tuple, a nested tuple and several float objects, and every filter is a Python
+# loop over all of them.
+
+# RecordTable turns the records sideways: one column per field. Numeric fields are packed into an array (8 bytes
+# per float, no objects), and string fields are dictionary-encoded: each distinct string is stored once, interned,
+# and the column itself is an array('I') of small integer codes. Predicates run over whole columns with NumPy
+# (np.frombuffer gives a zero-copy view of an array), producing a boolean mask, and filter/project build new tables
+# from the masked columns.
+
+"""
+    >>> from tuples import metro_areas
+    >>> table = RecordTable.from_records(metro_areas, METRO_FIELDS)
+    >>> western = table.filter(table.where('longitude', '<=', 0))
+    >>> western.values('name')
+    ['Mexico City', 'New York-Newark', 'Sao Paulo']
+    >>> list(table.filter(table.where('cc', 'in', {'JP', 'IN'})).project('name', 'pop'))
+    [('Tokyo', 36.933), ('Delhi NCR', 21.935)]
+    >>> names = table.project('name', 'pop')
+    >>> names.append(('Lagos', 15.4))
+    >>> len(names), len(table)
+    (6, 5)
+    >>> table.append(('Lima', 'PE', 'n/a', -12.05, -77.04))
+    Traceback (most recent call last):
+      ...
+    ValueError: could not convert string to float: 'n/a'
+    >>> table.append((7, 'PE', 9.7, -12.05, -77.04))  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+      ...
+    TypeError: intern() argument must be str, not int
+    >>> sorted({len(column) for column in table.columns.values()}), 7 in table.columns['name'].index
+    ([5], False)
+
+"""
+
+import csv
+import operator
+import sys
+from array import array
+
+STR = 'str'
+
+# the fields of a metro_areas record, with the (latitude, longitude) pair flattened into two columns
+METRO_FIELDS = [('name', STR), ('cc', STR), ('pop', 'd'), ('latitude', 'd'), ('longitude', 'd')]
+
+OPERATORS = {'<': operator.lt, '<=': operator.le, '==': operator.eq,
+             '!=': operator.ne, '>': operator.gt, '>=': operator.ge}
+
+
+# a dictionary-encoded string column: codes[i] is the position of row i's string in values
+class DictColumn:
+
+    def __init__(self, values=None, codes=None, index=None):
+        self.values = [] if values is None else values
+        if index is None:
+            index = {value: code for code, value in enumerate(self.values)}
+        self.index = index
+        self.codes = array('I') if codes is None else codes
+
+    # intern first: it raises TypeError for anything but a str, before the dictionary or the codes change. A new
+    # string only enters the dictionary once its code is in the column
+    def append(self, value):
+        value = sys.intern(value)
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes.append(code)
+            self.index[value] = code
+            self.values.append(value)
+        else:
+            self.codes.append(code)
+
+    # removes the last row; its string stays in the dictionary
+    def pop(self):
+        value = self[-1]
+        self.codes.pop()
+        return value
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __iter__(self):
+        return map(self.values.__getitem__, self.codes)
+
+    # the codes of the given strings; strings that never occur get no code and so can never match
+    def codes_for(self, strings):
+        return [self.index[s] for s in strings if s in self.index]
+
+
+# NumPy is imported by the methods that need it, so importing record_table (or just DictColumn) stays cheap
+def _numpy_view(column):
+    import numpy as np
+
+    codes = column.codes if isinstance(column, DictColumn) else column
+    return np.frombuffer(codes, dtype=codes.typecode) if len(codes) else np.array([], dtype=codes.typecode)
+
+
+class RecordTable:
+
+    def __init__(self, fields):
+        self.fields = [(name, typecode) for name, typecode in fields]
+        self.columns = {name: DictColumn() if typecode == STR else array(typecode)
+                        for name, typecode in self.fields}
+
+    @property
+    def names(self):
+        return [name for name, _ in self.fields]
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    # append one flat row, i.e. ('Tokyo', 'JP', 36.933, 35.689722, 139.691667). The row goes into every column or
+    # into none: all values are converted before the first column grows, and if a column still refuses the value
+    # (an array with a live NumPy view from column() raises BufferError), the columns already extended are rolled back
+    def append(self, row):
+        values = [sys.intern(value) if typecode == STR else float(value) if typecode in 'fd' else int(value)
+                  for (name, typecode), value in zip(self.fields, row, strict=True)]
+        extended = []
+        try:
+            for (name, _), value in zip(self.fields, values):
+                column = self.columns[name]
+                column.append(value)
+                extended.append(column)
+        except BaseException:
+            for column in extended:
+                column.pop()
+            raise
+
+    # records may hold nested tuples, i.e. (name, cc, pop, (lat, long)); they are flattened one level
+    @classmethod
+    def from_records(cls, records, fields):
+        table = cls(fields)
+        for record in records:
+            table.append(_flatten(record))
+        return table
+
+    # rows are appended as the CSV file is read: no list of tuples is ever built
+    @classmethod
+    def load_csv(cls, path, fields, header=True, **fmtparams):
+        table = cls(fields)
+        with open(path, newline='') as fp:
+            reader = csv.reader(fp, **fmtparams)
+            if header:
+                next(reader, None)
+            for row in reader:
+                table.append(row)
+        return table
+
+    def column(self, name):
+        return _numpy_view(self.columns[name])
+
+    def values(self, name):
+        return list(self.columns[name])
+
+    def __iter__(self):
+        return zip(*(self.columns[name] for name in self.names))
+
+    # a boolean NumPy mask, computed over the whole column at once.
+    # String columns support ==, != and 'in', which compare the integer codes, not the strings
+    def where(self, name, op, value):
+        import numpy as np
+
+        column = self.columns[name]
+        view = _numpy_view(column)
+        if isinstance(column, DictColumn):
+            if op == 'in':
+                return np.isin(view, column.codes_for(value))
+            if op not in ('==', '!='):
+                raise ValueError(f'unsupported operator for a string column: {op!r}')
+            codes = column.codes_for([value])
+            mask = view == codes[0] if codes else np.zeros(len(view), dtype=bool)
+            return mask if op == '==' else ~mask
+        if op == 'in':
+            return np.isin(view, list(value))
+        return OPERATORS[op](view, value)
+
+    # new table with the rows where mask is True. String columns keep sharing the same dictionary of values
+    def filter(self, mask):
+        table = type(self)(self.fields)
+        for name, typecode in self.fields:
+            column = self.columns[name]
+            selected = _numpy_view(column)[mask]
+            if isinstance(column, DictColumn):
+                table.columns[name] = DictColumn(column.values, array('I', selected.tobytes()), column.index)
+            else:
+                table.columns[name] = array(typecode, selected.tobytes())
+        return table
+
+    # new table with only the named columns. The columns are copied (a memcpy of each array), so appending to the
+    # projection leaves this table alone; string columns share their dictionary of values, as in filter
+    def project(self, *names):
+        fields = dict(self.fields)
+        table = type(self)([(name, fields[name]) for name in names])
+        for name in names:
+            column = self.columns[name]
+            if isinstance(column, DictColumn):
+                table.columns[name] = DictColumn(column.values, column.codes[:], column.index)
+            else:
+                table.columns[name] = column[:]
+        return table
+
+
+def _flatten(record):
+    flat = []
+    for field in record:
+        if isinstance(field, tuple):
+            flat.extend(field)
+        else:
+            flat.append(field)
+    return flat
+
+
+def benchmark(rows=10**6):
+    import random
+    from time import perf_counter
+    from tuples import metro_areas
+
+    records = [random.choice(metro_areas)[:3] + ((random.uniform(-90, 90), random.uniform(-180, 180)),)
+               for i in range(rows)]
+    table = RecordTable.from_records(records, METRO_FIELDS)
+
+    t0 = perf_counter()
+    western = [name for name, cc, pop, (latitude, longitude) in records if longitude <= 0]
+    loop = perf_counter() - t0
+
+    t0 = perf_counter()
+    mask = table.where('longitude', '<=', 0)
+    count = int(mask.sum())
+    scan = perf_counter() - t0
+    assert count == len(western)
+    print(f'{rows:,} rows: tuple unpacking {loop * 1e3:.1f}ms, column scan {scan * 1e3:.1f}ms '
+          f'({loop / scan:.0f}x)')
+
+
+def main():
+    from tuples import metro_areas
+
+    table = RecordTable.from_records(metro_areas, METRO_FIELDS)
+    print(f'{"":15} | {"lat.":^9} | {"long.":^9}')
+    western = table.filter(table.where('longitude', '<=', 0))
+    for name, latitude, longitude in western.project('name', 'latitude', 'longitude'):
+        print(f'{name:15} | {latitude:9.4f} | {longitude:9.4f}')
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
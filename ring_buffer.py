@@ -0,0 +1,312 @@
+# a numeric sliding window with running statistics, modeled on the deque(maxlen=10) example in deque.py
+
+# deque(maxlen=n) is a perfect sliding window, but it stores boxed Python floats, and every statistic over the
+# window (sum, mean, min, max) is a fresh O(n) pass. RingBuffer stores the window in a preallocated array('d') that
+# is used as a circle: the slot of an item is its position modulo maxlen, so appending to a full buffer overwrites
+# the oldest value in place and nothing is ever shifted.
+
+# statistics are updated as items enter and leave the window:
+# - sum, mean and variance with Welford's update, which is O(1) and numerically stable, and can be run backwards to
+#   remove a value. Running it backwards is not stable, though: removing a value that dwarfs the rest of the window
+#   (a 1e17 spike leaving a window of small readings) cancels away every digit of the small ones, and the error then
+#   stays in the running totals. So the totals are recomputed from the window with math.fsum whenever a removal
+#   cancels more than RECOMPUTE_RATIO times the variance that is left, and in any case once every maxlen removals,
+#   which bounds the slow drift of ordinary rounding. Both cost O(maxlen) at most once per maxlen removals in a
+#   normal stream, so appends stay O(1) amortized
+# - min and max with monotonic deques: the max deque holds, from left to right, the positions of the items that are
+#   larger than everything to their right. The max is always at its left end. Each item enters and leaves the deque
+#   at most once, so a stream of appends costs amortized O(1) per item.
+
+# the monotonic deques only stay valid while items are added on the right and evicted on the left (or added on the
+# left of a buffer that is not full). appendleft on a full buffer, pop and rotate mark them stale instead, and the
+# next call to min or max rebuilds them with a single pass over the window.
+
+"""
+    >>> rb = RingBuffer(4, [3, 1, 4, 1])
+    >>> rb.append(5)
+    >>> rb
+    RingBuffer([1.0, 4.0, 1.0, 5.0], maxlen=4)
+    >>> rb.sum(), rb.mean(), rb.min(), rb.max()
+    (11.0, 2.75, 1.0, 5.0)
+    >>> rb.rotate(1)
+    >>> list(rb), rb.max()
+    ([5.0, 1.0, 4.0, 1.0], 5.0)
+    >>> round(rb.variance(), 4)
+    3.1875
+
+A spike leaves nothing behind once it is out of the window::
+    >>> rb = RingBuffer(10, [1e17] * 10 + [1.0, 2.0, 3.0] * 10)
+    >>> list(rb)
+    [3.0, 1.0, 2.0, 3.0, 1.0, 2.0, 3.0, 1.0, 2.0, 3.0]
+    >>> rb.sum(), rb.mean(), round(rb.variance(), 4)
+    (21.0, 2.1, 0.69)
+
+"""
+
+import math
+from array import array
+from collections import deque
+
+# a removal whose squared distance from the mean exceeds this multiple of the remaining sum of squared deviations
+# would lose about 20 bits of the variance to cancellation
+RECOMPUTE_RATIO = 2**20
+
+
+class RingBuffer:
+    typecode = 'd'
+
+    def __init__(self, maxlen, iterable=()):
+        if maxlen < 1:
+            raise ValueError('maxlen must be at least 1')
+        self._data = array(self.typecode, [0.0]) * maxlen
+        self._maxlen = maxlen
+        self._start = 0  # position of the leftmost item. Item i lives in slot (start + i) % maxlen
+        self._len = 0
+        self._mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean, as in Welford's algorithm
+        self._sum = 0.0
+        self._removals = 0  # since the totals were last recomputed from the window
+        self._max_positions = deque()
+        self._min_positions = deque()
+        self._stale = False
+        self.extend(iterable)
+
+    @property
+    def maxlen(self):
+        return self._maxlen
+
+    def __len__(self):
+        return self._len
+
+    def _slot(self, position):
+        return position % self._maxlen
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('RingBuffer index out of range')
+        return self._data[self._slot(self._start + index)]
+
+    def __iter__(self):
+        data, maxlen = self._data, self._maxlen
+        for position in range(self._start, self._start + self._len):
+            yield data[position % maxlen]
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self)!r}, maxlen={self._maxlen})'
+
+    # Welford's update and its inverse
+    def _add_stats(self, x):
+        self._sum += x
+        n = self._len
+        delta = x - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (x - self._mean)
+
+    def _remove_stats(self, x):
+        self._sum -= x
+        n = self._len
+        if n == 0:
+            self._mean = self._m2 = self._sum = 0.0
+            self._removals = 0
+            return
+        delta = x - self._mean
+        self._mean -= delta / n
+        # rounding can push m2 slightly below zero after many removals
+        self._m2 = max(self._m2 - delta * (x - self._mean), 0.0)
+        self._removals += 1
+        if delta * delta > self._m2 * RECOMPUTE_RATIO or self._removals >= self._maxlen:
+            self._recompute()
+
+    # exact sum, then the mean and the squared deviations from it: a two-pass computation over the window
+    def _recompute(self):
+        values = list(self)
+        self._removals = 0
+        self._sum = math.fsum(values)
+        self._mean = self._sum / len(values)
+        self._m2 = math.fsum((x - self._mean) ** 2 for x in values)
+
+    def append(self, x):
+        x = float(x)
+        if self._len == self._maxlen:
+            self.popleft()
+        position = self._start + self._len
+        self._data[self._slot(position)] = x
+        self._len += 1
+        self._add_stats(x)
+        if not self._stale:
+            data = self._data
+            maxes, mins = self._max_positions, self._min_positions
+            while maxes and data[self._slot(maxes[-1])] <= x:
+                maxes.pop()
+            maxes.append(position)
+            while mins and data[self._slot(mins[-1])] >= x:
+                mins.pop()
+            mins.append(position)
+
+    def appendleft(self, x):
+        x = float(x)
+        if self._len == self._maxlen:
+            self.pop()
+        self._start -= 1
+        self._data[self._slot(self._start)] = x
+        self._len += 1
+        self._add_stats(x)
+        # a new leftmost item is only a candidate if it beats everything already in the window
+        if not self._stale:
+            data = self._data
+            maxes, mins = self._max_positions, self._min_positions
+            if not maxes or x > data[self._slot(maxes[0])]:
+                maxes.appendleft(self._start)
+            if not mins or x < data[self._slot(mins[0])]:
+                mins.appendleft(self._start)
+
+    def popleft(self):
+        if not self._len:
+            raise IndexError('pop from an empty RingBuffer')
+        position = self._start
+        x = self._data[self._slot(position)]
+        self._start += 1
+        self._len -= 1
+        self._remove_stats(x)
+        if not self._stale:
+            if self._max_positions[0] == position:
+                self._max_positions.popleft()
+            if self._min_positions[0] == position:
+                self._min_positions.popleft()
+        return x
+
+    def pop(self):
+        if not self._len:
+            raise IndexError('pop from an empty RingBuffer')
+        self._len -= 1
+        x = self._data[self._slot(self._start + self._len)]
+        self._remove_stats(x)
+        self._stale = True
+        return x
+
+    def extend(self, iterable):
+        for x in iterable:
+            self.append(x)
+
+    def extendleft(self, iterable):
+        for x in iterable:
+            self.appendleft(x)
+
+    # rotate(n) moves n items from the right end to the left end (n < 0 goes the other way), like deque.rotate.
+    # When the buffer is full that is just a change of the start position: no data moves at all
+    def rotate(self, n=1):
+        if self._len <= 1:
+            return
+        n %= self._len
+        if not n:
+            return
+        if self._len == self._maxlen:
+            self._start -= n
+        else:
+            moved = [self[i] for i in range(self._len - n, self._len)]
+            for i in range(self._len - 1, n - 1, -1):
+                self._data[self._slot(self._start + i)] = self._data[self._slot(self._start + i - n)]
+            for i, x in enumerate(moved):
+                self._data[self._slot(self._start + i)] = x
+        self._stale = True
+
+    def clear(self):
+        self._start = self._len = self._removals = 0
+        self._mean = self._m2 = self._sum = 0.0
+        self._max_positions.clear()
+        self._min_positions.clear()
+        self._stale = False
+
+    def _rebuild(self):
+        self._max_positions.clear()
+        self._min_positions.clear()
+        self._stale = False
+        data = self._data
+        maxes, mins = self._max_positions, self._min_positions
+        for position in range(self._start, self._start + self._len):
+            x = data[self._slot(position)]
+            while maxes and data[self._slot(maxes[-1])] <= x:
+                maxes.pop()
+            maxes.append(position)
+            while mins and data[self._slot(mins[-1])] >= x:
+                mins.pop()
+            mins.append(position)
+
+    def sum(self):
+        return self._sum
+
+    def mean(self):
+        if not self._len:
+            raise ValueError('mean of an empty RingBuffer')
+        return self._mean
+
+    # population variance by default; ddof=1 gives the sample variance, like statistics.variance
+    def variance(self, ddof=0):
+        if self._len <= ddof:
+            raise ValueError('not enough items for variance')
+        return self._m2 / (self._len - ddof)
+
+    def stdev(self, ddof=0):
+        return self.variance(ddof) ** 0.5
+
+    def max(self):
+        if not self._len:
+            raise ValueError('max of an empty RingBuffer')
+        if self._stale:
+            self._rebuild()
+        return self._data[self._slot(self._max_positions[0])]
+
+    def min(self):
+        if not self._len:
+            raise ValueError('min of an empty RingBuffer')
+        if self._stale:
+            self._rebuild()
+        return self._data[self._slot(self._min_positions[0])]
+
+
+def benchmark(samples=10**6, window=1000):
+    import random
+    from time import perf_counter
+
+    stream = [random.random() for i in range(samples)]
+
+    # the baseline recomputes every statistic with a full pass over the deque, for every sample
+    dq = deque(maxlen=window)
+    t0 = perf_counter()
+    for x in stream[:samples // 100]:
+        dq.append(x)
+        stats = sum(dq) / len(dq), min(dq), max(dq)
+    baseline = (perf_counter() - t0) / (samples // 100)
+
+    rb = RingBuffer(window)
+    t0 = perf_counter()
+    for x in stream:
+        rb.append(x)
+        stats = rb.mean(), rb.min(), rb.max()
+    ring = (perf_counter() - t0) / samples
+    print(f'window {window}: deque + full pass {baseline * 1e6:.2f}us/sample, '
+          f'RingBuffer {ring * 1e6:.2f}us/sample ({baseline / ring:.0f}x)')
+
+
+def main():
+    # the same steps as deque.py
+    rb = RingBuffer(10, range(10))
+    print(rb)
+    rb.rotate(3)
+    print(rb)
+    rb.rotate(-4)
+    print(rb)
+    rb.appendleft(-1)
+    print(rb)
+    rb.extend([11, 22, 33])
+    print(rb)
+    rb.extendleft([10, 20, 30, 40])
+    print(rb)
+    print(f'sum={rb.sum()} mean={rb.mean()} stdev={rb.stdev():.3f} min={rb.min()} max={rb.max()}')
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+# an immutable sequence with cheap concatenation, for the t *= 2 corner of slicing_and_sequences.py
+
+# t *= 2 on a tuple, and every t = t + (item,), creates a new tuple and copies the whole target into it. Building a
+# log of n events by repeated concatenation therefore copies O(n**2) references.
+
+# a Rope is a balanced binary tree whose leaves are short tuples. Nothing in a rope is ever modified, so a new rope can
+# share whole subtrees with the ropes it was built from (structural sharing): concatenation only creates the O(log n)
+# nodes along one edge of the tree, and the rest is reused. The tree is kept balanced like an AVL tree: the heights
+# of the two children of every node differ by at most one, so indexing is O(log n) too.
+
+# r * n is built by doubling (r, r + r, (r + r) + (r + r), ...), so it takes O(log n) concatenations and shares all of
+# them. Slices with step 1 split the tree along two paths and share everything in between.
+
+"""
+    >>> log = Rope()
+    >>> for event in range(5):
+    ...     log += (event,)
+    >>> log
+    Rope((0, 1, 2, 3, 4))
+    >>> (log + log)[3:7]
+    Rope((3, 4, 0, 1))
+    >>> big = Rope(range(10)) * 10**12
+    >>> len(big), big[-1], big.height() < 100
+    (10000000000000, 9, True)
+    >>> hash(log) == hash((0, 1, 2, 3, 4))
+    True
+
+"""
+
+from itertools import chain, islice
+
+LEAF_SIZE = 64
+
+
+class _Node:
+    __slots__ = ('left', 'right', 'length', 'height')
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.length = _length(left) + _length(right)
+        self.height = max(_height(left), _height(right)) + 1
+
+
+# leaves are plain tuples of at most LEAF_SIZE items, with height 0
+def _length(tree):
+    return tree.length if type(tree) is _Node else len(tree)
+
+
+def _height(tree):
+    return tree.height if type(tree) is _Node else 0
+
+
+# build a node from two subtrees whose heights differ by at most 2, rotating once or twice if they differ by 2
+def _balance(left, right):
+    hl, hr = _height(left), _height(right)
+    if hl > hr + 1:
+        if _height(left.left) >= _height(left.right):
+            return _Node(left.left, _Node(left.right, right))
+        middle = left.right
+        return _Node(_Node(left.left, middle.left), _Node(middle.right, right))
+    if hr > hl + 1:
+        if _height(right.right) >= _height(right.left):
+            return _Node(_Node(left, right.left), right.right)
+        middle = right.left
+        return _Node(_Node(left, middle.left), _Node(middle.right, right.right))
+    return _Node(left, right)
+
+
+# concatenate two trees in O(|height difference|): walk down the taller tree along its inner edge until the heights
+# match, join there, and rebalance on the way back up
+def _join(left, right):
+    if not _length(left):
+        return right
+    if not _length(right):
+        return left
+    hl, hr = _height(left), _height(right)
+    if hl > hr + 1:
+        return _balance(left.left, _join(left.right, right))
+    if hr > hl + 1:
+        return _balance(_join(left, right.left), right.right)
+    if hl == hr == 0 and len(left) + len(right) <= LEAF_SIZE:
+        return left + right
+    return _Node(left, right)
+
+
+# split a tree into the first i items and the rest
+def _split(tree, i):
+    if type(tree) is not _Node:
+        return tree[:i], tree[i:]
+    left_length = _length(tree.left)
+    if i < left_length:
+        a, b = _split(tree.left, i)
+        return a, _join(b, tree.right)
+    if i > left_length:
+        a, b = _split(tree.right, i - left_length)
+        return _join(tree.left, a), b
+    return tree.left, tree.right
+
+
+# a balanced tree from a tuple, cut into full leaves
+def _build(items):
+    level = [items[i:i + LEAF_SIZE] for i in range(0, len(items), LEAF_SIZE)] or [()]
+    while len(level) > 1:
+        pairs = [_Node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            pairs[-1] = _join(pairs[-1], level[-1])
+        level = pairs
+    return level[0]
+
+
+def _leaves(tree):
+    stack = [tree]
+    while stack:
+        tree = stack.pop()
+        if type(tree) is _Node:
+            stack.append(tree.right)
+            stack.append(tree.left)
+        elif tree:
+            yield tree
+
+
+class Rope:
+    __slots__ = ('_tree', '_hash')
+
+    def __init__(self, iterable=()):
+        if isinstance(iterable, Rope):
+            self._tree = iterable._tree
+        else:
+            self._tree = _build(tuple(iterable))
+        self._hash = None
+
+    @classmethod
+    def _from_tree(cls, tree):
+        rope = cls.__new__(cls)
+        rope._tree = tree
+        rope._hash = None
+        return rope
+
+    def __len__(self):
+        return _length(self._tree)
+
+    def height(self):
+        return _height(self._tree)
+
+    def __iter__(self):
+        return chain.from_iterable(_leaves(self._tree))
+
+    def __reversed__(self):
+        for leaf in reversed(list(_leaves(self._tree))):
+            yield from reversed(leaf)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return Rope(islice(self, start, stop, step) if step > 0 else tuple(self)[index])
+            if stop <= start:
+                return Rope()
+            head, _ = _split(self._tree, stop)
+            _, middle = _split(head, start)
+            return self._from_tree(middle)
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('Rope index out of range')
+        tree = self._tree
+        while type(tree) is _Node:
+            left_length = _length(tree.left)
+            if index < left_length:
+                tree = tree.left
+            else:
+                index -= left_length
+                tree = tree.right
+        return tree[index]
+
+    def __add__(self, other):
+        if isinstance(other, Rope):
+            return self._from_tree(_join(self._tree, other._tree))
+        if isinstance(other, tuple):
+            return self._from_tree(_join(self._tree, _build(other)))
+        return NotImplemented
+
+    # tuple + rope gives a rope as well
+    def __radd__(self, other):
+        if isinstance(other, tuple):
+            return self._from_tree(_join(_build(other), self._tree))
+        return NotImplemented
+
+    def __mul__(self, n):
+        if not isinstance(n, int):
+            return NotImplemented
+        result, power = (), self._tree
+        while n > 0:
+            if n & 1:
+                result = _join(result, power)
+            n >>= 1
+            if n:
+                power = _join(power, power)
+        return self._from_tree(result)
+
+    __rmul__ = __mul__
+
+    def append(self, item):
+        return self + (item,)
+
+    def totuple(self):
+        return tuple(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, Rope):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    # the same hash as the equivalent tuple, computed once: the rope can never change
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(tuple(self))
+        return self._hash
+
+    def __repr__(self):
+        return f'{type(self).__name__}({tuple(self)!r})'
+
+    def index(self, value, start=0, stop=None):
+        start, stop, _ = slice(start, stop).indices(len(self))
+        for i, item in enumerate(islice(self, start, stop), start):
+            if item == value:
+                return i
+        raise ValueError(f'{value!r} is not in Rope')
+
+    def count(self, value):
+        return sum(1 for item in self if item == value)
+
+    def __contains__(self, value):
+        return any(item == value for item in self)
+
+
+def benchmark(events=(10**3, 10**4, 5 * 10**4)):
+    from time import perf_counter
+
+    for n in events:
+        t0 = perf_counter()
+        log = ()
+        for event in range(n):
+            log += (event,)
+        concatenation = perf_counter() - t0
+
+        t0 = perf_counter()
+        rope = Rope()
+        for event in range(n):
+            rope += (event,)
+        roped = perf_counter() - t0
+        assert rope.totuple() == log
+        print(f'{n:>8,} appends: tuple {concatenation:7.3f}s, Rope {roped:7.3f}s')
+
+
+def main():
+    t = Rope((1, 2, 3))
+    print(t, hash(t) == hash((1, 2, 3)))
+    t *= 2
+    print(t)
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
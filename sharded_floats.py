@@ -0,0 +1,171 @@
+# a sharded version of the array.tofile / array.fromfile round trip shown in arrays.py
+
+# a single tofile call writes everything from one thread to one file. Here a large array is split into N contiguous
+# shards, each written to its own file, plus a small JSON manifest that records the typecode, the byte order, how many
+# items each shard holds and a CRC-32 checksum of each shard.
+
+# file I/O and zlib.crc32 release the GIL while they work on large buffers, so a ThreadPoolExecutor is enough to keep
+# several disks (or several queues of one fast SSD) busy at once. No process pool is needed, and no bytes are copied:
+# every shard is written from, and read into, a memoryview slice of the one array.
+
+# the checksums let verify() point at a corrupt shard by name, and read_sharded() refuses to return corrupt data.
+
+import json
+import os
+import sys
+import zlib
+from array import array
+
+MANIFEST = 'manifest.json'
+
+
+# split count items into n contiguous (start, stop) ranges whose sizes differ by at most one
+def shard_ranges(count, n):
+    size, extra = divmod(count, n)
+    start = 0
+    for i in range(n):
+        stop = start + size + (1 if i < extra else 0)
+        yield start, stop
+        start = stop
+
+
+# concurrent.futures pulls in threading and logging, so it is imported when a pool is needed, not with the module
+def _executor(max_workers):
+    from concurrent.futures import ThreadPoolExecutor
+
+    return ThreadPoolExecutor(max_workers)
+
+
+def _write_shard(path, octets):
+    with open(path, 'wb') as fp:
+        fp.write(octets)
+    return zlib.crc32(octets)
+
+
+def write_sharded(floats, directory, shards=4, max_workers=None):
+    if shards < 1:
+        raise ValueError(f'shards must be at least 1, not {shards}')
+    os.makedirs(directory, exist_ok=True)
+    octets = memoryview(floats).cast('B')
+    itemsize = floats.itemsize
+    ranges = list(shard_ranges(len(floats), shards))
+    names = [f'shard-{i:04d}.bin' for i in range(len(ranges))]
+    paths = [os.path.join(directory, name) for name in names]
+    sources = [octets[start * itemsize:stop * itemsize] for start, stop in ranges]
+    with _executor(max_workers or shards) as executor:
+        checksums = list(executor.map(_write_shard, paths, sources))
+    # release the views, otherwise the caller could no longer resize the array
+    for source in sources:
+        source.release()
+    octets.release()
+    manifest = {
+        'typecode': floats.typecode,
+        'byteorder': sys.byteorder,
+        'count': len(floats),
+        'shards': [{'file': name, 'count': stop - start, 'crc32': crc}
+                   for name, (start, stop), crc in zip(names, ranges, checksums)],
+    }
+    # the manifest is written last, so a directory without one is an incomplete write
+    with open(os.path.join(directory, MANIFEST), 'w') as fp:
+        json.dump(manifest, fp, indent=2)
+    return manifest
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST)) as fp:
+        return json.load(fp)
+
+
+# a shard must hold exactly len(target) bytes, like in verify(): after filling the target, one more byte is read to
+# catch a file that is too long. A shard that cannot be read is reported like a corrupt one
+def _read_shard(path, target):
+    try:
+        with open(path, 'rb') as fp:
+            read = fp.readinto(target)
+            extra = fp.read(1)
+    except OSError:
+        return None
+    if read != len(target) or extra:
+        return None
+    return zlib.crc32(target)
+
+
+def read_sharded(directory, max_workers=None):
+    manifest = read_manifest(directory)
+    shards = manifest['shards']
+    # allocate the whole array once, then let every thread fill its own slice of it in place
+    floats = array(manifest['typecode'], [0]) * manifest['count']
+    octets = memoryview(floats).cast('B')
+    targets = []
+    offset = 0
+    for shard in shards:
+        size = shard['count'] * floats.itemsize
+        targets.append(octets[offset:offset + size])
+        offset += size
+    paths = [os.path.join(directory, shard['file']) for shard in shards]
+    with _executor(max_workers or len(shards) or 1) as executor:
+        checksums = list(executor.map(_read_shard, paths, targets))
+    for target in targets:
+        target.release()
+    octets.release()
+    bad = [shard['file'] for shard, crc in zip(shards, checksums) if crc != shard['crc32']]
+    if bad:
+        raise ValueError(f'corrupt shards in {directory!r}: {", ".join(bad)}')
+    if manifest['byteorder'] != sys.byteorder:
+        floats.byteswap()
+    return floats
+
+
+def _check_shard(path, shard, itemsize):
+    try:
+        with open(path, 'rb') as fp:
+            octets = fp.read()
+    except OSError:
+        return False
+    return len(octets) == shard['count'] * itemsize and zlib.crc32(octets) == shard['crc32']
+
+
+# check every shard against the manifest concurrently and return the names of the bad ones
+def verify(directory, max_workers=None):
+    manifest = read_manifest(directory)
+    shards = manifest['shards']
+    itemsize = array(manifest['typecode']).itemsize
+    paths = [os.path.join(directory, shard['file']) for shard in shards]
+    with _executor(max_workers or len(shards) or 1) as executor:
+        results = list(executor.map(_check_shard, paths, shards, [itemsize] * len(shards)))
+    return [shard['file'] for shard, ok in zip(shards, results) if not ok]
+
+
+def benchmark(count=10**7, shards=(1, 2, 4, 8), directory='floats_shards'):
+    import shutil
+    from random import random
+    from time import perf_counter
+
+    floats = array('d', (random() for i in range(count)))
+
+    t0 = perf_counter()
+    with open('floats.bin', 'wb') as fp:
+        floats.tofile(fp)
+    floats2 = array('d')
+    with open('floats.bin', 'rb') as fp:
+        floats2.fromfile(fp, count)
+    single = perf_counter() - t0
+    assert floats2 == floats
+    print(f'single file: {single:.3f}s')
+
+    for n in shards:
+        t0 = perf_counter()
+        write_sharded(floats, directory, shards=n)
+        floats2 = read_sharded(directory)
+        elapsed = perf_counter() - t0
+        assert floats2 == floats
+        print(f'{n} shards:    {elapsed:.3f}s ({single / elapsed:.2f}x)')
+        shutil.rmtree(directory)
+
+
+def main():
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
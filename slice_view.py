@@ -0,0 +1,125 @@
+# zero-copy slicing for the sequences in slicing_and_sequences.py
+
+# l[:2], l[2:] and a[3::2] each build a new list and copy the references into it. Taking many overlapping windows of
+# a big list that way copies the same data over and over. SliceView keeps a reference to the original sequence plus a
+# range of the positions it covers. Slicing a view slices the range (which is O(1)) and keeps pointing at the same
+# base sequence, so views of views compose without copying and without stacking one wrapper on another.
+
+# the view is live: changes to the base sequence show through, as with memoryview. Use copy() for a snapshot.
+# For buffer-backed data (array, bytes, bytearray) memoryview() gives a real memoryview over the same memory, which
+# can be passed to file.write, array.frombytes, hashlib and other C code directly.
+
+"""
+    >>> l = [10, 20, 30, 40, 50, 60]
+    >>> head, tail = SliceView(l)[:2], SliceView(l)[2:]
+    >>> list(head), list(tail)
+    ([10, 20], [30, 40, 50, 60])
+    >>> tail[::2][1:]
+    SliceView([10, 20, 30, 40, 50, 60], range(4, 6, 2))
+    >>> tail[::2][1:].copy()
+    [50]
+    >>> from array import array
+    >>> a = array('h', range(10))
+    >>> SliceView(a)[3::2].memoryview().tolist()
+    [3, 5, 7, 9]
+
+"""
+
+from collections import abc
+
+
+class SliceView(abc.Sequence):
+
+    def __init__(self, base, index=slice(None)):
+        if isinstance(base, SliceView):
+            # a view of a view: compose the ranges and point at the original sequence
+            positions = base._range[index]
+            base = base._base
+        else:
+            positions = range(len(base))[index]
+        self._base = base
+        self._range = positions
+
+    def __len__(self):
+        return len(self._range)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SliceView(self, index)
+        return self._base[self._range[index]]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            positions = self._range[index]
+            values = list(value)
+            if len(values) != len(positions):
+                raise ValueError(f'attempt to assign sequence of size {len(values)} '
+                                 f'to a view slice of size {len(positions)}')
+            for position, item in zip(positions, values):
+                self._base[position] = item
+        else:
+            self._base[self._range[index]] = value
+
+    def __iter__(self):
+        base = self._base
+        for position in self._range:
+            yield base[position]
+
+    def __reversed__(self):
+        return SliceView(self, slice(None, None, -1)).__iter__()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._base!r}, {self._range!r})'
+
+    def __eq__(self, other):
+        if isinstance(other, SliceView):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    # the slice of the base sequence that this view covers, as a slice object
+    def slice(self):
+        r = self._range
+        if not r:
+            return slice(0, 0)
+        stop = r.stop if r.stop >= 0 else None
+        return slice(r.start, stop, r.step)
+
+    # materialize: a new object of the base type (list, tuple, array, str...) built by one slicing operation
+    def copy(self):
+        return self._base[self.slice()]
+
+    # for buffer-backed bases: a memoryview of the same memory, sliced in C without copying
+    def memoryview(self):
+        return memoryview(self._base)[self.slice()]
+
+
+def main():
+    from array import array
+    from time import perf_counter
+
+    l = [10, 20, 30, 40, 50, 60]
+    view = SliceView(l)
+    print(view[:2], list(view[:2]))
+    print(view[2:], list(view[2:]))
+    print(view[3:].copy())
+
+    # many overlapping windows over one large list: slicing copies every window, views copy nothing
+    big = list(range(10**6))
+    window, count = 10**5, 1000
+    t0 = perf_counter()
+    copies = [big[i:i + window] for i in range(count)]
+    copying = perf_counter() - t0
+    # drop the copies first, so the garbage collector does not scan them while the views are timed
+    del copies
+    t0 = perf_counter()
+    views = [SliceView(big)[i:i + window] for i in range(count)]
+    viewing = perf_counter() - t0
+    print(f'{count} windows of {window:,}: slicing {copying:.3f}s, SliceView {viewing:.4f}s')
+
+    floats = array('d', range(10))
+    memv = SliceView(floats)[1::3].memoryview()
+    print(memv.tolist())
+
+
+if __name__ == '__main__':
+    main()
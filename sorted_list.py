@@ -0,0 +1,278 @@
+# a sorted container for large collections, built from the same bisect functions shown in binary_search.py
+
+# bisect.insort finds the insertion point in O(log n), but list.insert then shifts every item after that point one
+# slot to the right. Building a list of n items with insort is therefore O(n**2), which is fine for SIZE = 7 and
+# hopeless for ten million items.
+
+# SortedList keeps the items in many short sorted lists (blocks) of at most `load * 2` items, plus `_maxes`, a list
+# with the largest item of each block. Finding the right block is a bisect over _maxes, and inserting only shifts the
+# items of one short block. When a block grows too large it is split in two.
+
+# positional access (sl[i], bisect_left, bisect_right) needs the number of items before each block. A list of
+# cumulative offsets would have to be rebuilt after every add, O(n / load) each time; instead the block lengths are
+# kept in a Fenwick tree (binary indexed tree), where both updating one length and summing the lengths of the first i
+# blocks take O(log(n / load)). Only a split or a block that empties changes the block numbering; then the tree is
+# rebuilt in O(n / load), which costs no more than the list insert or delete on _blocks that caused it, and happens at
+# most once every `load` changes.
+
+"""
+Drop-in for insort and bisect::
+    >>> sl = SortedList([14, 1, 7, 4])
+    >>> sl.add(7)
+    >>> list(sl)
+    [1, 4, 7, 7, 14]
+    >>> sl.bisect_left(7), sl.bisect_right(7)
+    (2, 4)
+    >>> sl[-1], sl[1:3]
+    (14, [4, 7])
+    >>> list(sl.irange(4, 7))
+    [4, 7, 7]
+    >>> sl.remove(7)
+    >>> 7 in sl, len(sl)
+    (True, 4)
+
+"""
+
+import bisect
+from itertools import chain, islice
+
+
+class SortedList:
+
+    def __init__(self, iterable=(), load=1000):
+        self._load = load
+        self._blocks = []
+        self._maxes = []
+        self._tree = None
+        self._len = 0
+        self.update(iterable)
+
+    # bulk loading sorts once and cuts the result into blocks: O(n log n) instead of n separate adds
+    def update(self, iterable):
+        items = sorted(chain(self, iterable))
+        load = self._load
+        self._blocks = [items[i:i + load] for i in range(0, len(items), load)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(items)
+        self._tree = None
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._blocks)
+
+    def __reversed__(self):
+        return chain.from_iterable(reversed(block) for block in reversed(self._blocks))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self)!r})'
+
+    # like bisect.insort: the new item goes after any existing equal items
+    def add(self, item):
+        maxes = self._maxes
+        if not maxes:
+            self._blocks.append([item])
+            maxes.append(item)
+            self._tree = None
+        else:
+            i = bisect.bisect_right(maxes, item)
+            if i == len(maxes):
+                # larger than everything: append to the last block
+                i -= 1
+                self._blocks[i].append(item)
+                maxes[i] = item
+            else:
+                bisect.insort(self._blocks[i], item)
+            if len(self._blocks[i]) > self._load * 2:
+                self._split(i)
+            elif self._tree is not None:
+                self._tree_add(i, 1)
+        self._len += 1
+
+    def _split(self, i):
+        block = self._blocks[i]
+        half = len(block) // 2
+        self._blocks[i:i + 1] = [block[:half], block[half:]]
+        self._maxes[i:i + 1] = [block[half - 1], block[-1]]
+        self._tree = None
+
+    def remove(self, item):
+        i = bisect.bisect_left(self._maxes, item)
+        if i < len(self._maxes):
+            block = self._blocks[i]
+            j = bisect.bisect_left(block, item)
+            if block[j] == item:
+                del block[j]
+                if block:
+                    self._maxes[i] = block[-1]
+                    if self._tree is not None:
+                        self._tree_add(i, -1)
+                else:
+                    del self._blocks[i]
+                    del self._maxes[i]
+                    self._tree = None
+                self._len -= 1
+                return
+        raise ValueError(f'{item!r} not in {type(self).__name__}')
+
+    def discard(self, item):
+        try:
+            self.remove(item)
+        except ValueError:
+            pass
+
+    def __contains__(self, item):
+        i = bisect.bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return False
+        block = self._blocks[i]
+        return block[bisect.bisect_left(block, item)] == item
+
+    # the Fenwick tree is 1-based: tree[k] holds the total length of the blocks k - (k & -k) .. k - 1, so block i is
+    # counted in tree[i + 1] and in every entry reached from there by adding the lowest set bit
+    def _fenwick(self):
+        if self._tree is None:
+            tree = [0] + [len(block) for block in self._blocks]
+            size = len(tree)
+            for k in range(1, size):
+                parent = k + (k & -k)
+                if parent < size:
+                    tree[parent] += tree[k]
+            self._tree = tree
+        return self._tree
+
+    def _tree_add(self, i, delta):
+        tree = self._tree
+        k, size = i + 1, len(tree)
+        while k < size:
+            tree[k] += delta
+            k += k & -k
+
+    # number of items in the blocks before block i
+    def _offset(self, i):
+        tree = self._fenwick()
+        total = 0
+        while i:
+            total += tree[i]
+            i &= i - 1
+        return total
+
+    def bisect_left(self, item):
+        i = bisect.bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return self._len
+        return self._offset(i) + bisect.bisect_left(self._blocks[i], item)
+
+    def bisect_right(self, item):
+        i = bisect.bisect_right(self._maxes, item)
+        if i == len(self._maxes):
+            return self._len
+        return self._offset(i) + bisect.bisect_right(self._blocks[i], item)
+
+    # same alias the bisect module uses
+    bisect = bisect_right
+
+    # turn a position in the whole list into (block index, position inside the block)
+    def _locate(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(f'{type(self).__name__} index out of range')
+        # walk down the Fenwick tree, skipping every span of blocks that ends at or before index
+        tree = self._fenwick()
+        size = len(tree)
+        i, step = 0, 1 << (size - 1).bit_length()
+        while step:
+            if i + step < size and tree[i + step] <= index:
+                i += step
+                index -= tree[i]
+            step >>= 1
+        return i, index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step == 1:
+                return list(islice(self._iter_from(start), max(stop - start, 0)))
+            return [self[i] for i in range(start, stop, step)]
+        i, j = self._locate(index)
+        return self._blocks[i][j]
+
+    def __delitem__(self, index):
+        i, j = self._locate(index)
+        self.remove(self._blocks[i][j])
+
+    def _iter_from(self, start):
+        if start >= self._len:
+            return iter(())
+        i, j = self._locate(start)
+        return chain(islice(self._blocks[i], j, None), chain.from_iterable(self._blocks[i + 1:]))
+
+    def index(self, item):
+        position = self.bisect_left(item)
+        if position < self._len and self[position] == item:
+            return position
+        raise ValueError(f'{item!r} not in {type(self).__name__}')
+
+    def count(self, item):
+        return self.bisect_right(item) - self.bisect_left(item)
+
+    # iterate over the items x with minimum <= x <= maximum (both bounds optional) without copying the list
+    def irange(self, minimum=None, maximum=None):
+        start = 0 if minimum is None else self.bisect_left(minimum)
+        stop = self._len if maximum is None else self.bisect_right(maximum)
+        return islice(self._iter_from(start), max(stop - start, 0))
+
+
+def benchmark(max_exponent=7):
+    import random
+    from time import perf_counter
+
+    random.seed(1)
+    for exponent in range(3, max_exponent + 1):
+        n = 10**exponent
+        items = [random.random() for i in range(n)]
+        t0 = perf_counter()
+        sl = SortedList()
+        for item in items:
+            sl.add(item)
+        elapsed = perf_counter() - t0
+        line = f'{n:>12,} inserts  SortedList {elapsed:8.3f}s ({elapsed / n * 1e9:6.0f} ns/insert)'
+        # insort into a plain list becomes quadratic; stop measuring it once it gets too slow to wait for
+        if exponent <= 5:
+            t0 = perf_counter()
+            plain = []
+            for item in items:
+                bisect.insort(plain, item)
+            insort_time = perf_counter() - t0
+            assert plain == list(sl)
+            line += f'  insort {insort_time:8.3f}s'
+        print(line)
+        # positional queries between the adds: each one follows a change, so nothing cached can be reused. The time per
+        # round should grow with log n, not with n; bisect on a plain list of the same floats shows how much of the
+        # growth is only cache misses on a larger heap
+        rounds = 10**4
+        probes = [random.random() for i in range(rounds)]
+        t0 = perf_counter()
+        for probe in probes:
+            sl.add(probe)
+            sl[sl.bisect_left(probe)]
+        elapsed = perf_counter() - t0
+        plain = list(sl)
+        t0 = perf_counter()
+        for probe in probes:
+            bisect.bisect_left(plain, probe)
+        reference = perf_counter() - t0
+        print(f'{"":>12} mixed add + bisect_left + getitem {elapsed / rounds * 1e6:6.2f} µs/round  '
+              f'(bisect.bisect_left on a list {reference / rounds * 1e6:5.2f} µs)')
+
+
+def main():
+    import sys
+
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+# nearest-metro queries over (latitude, longitude) tuples like lax_coordinates and metro_areas in tuples.py
+
+# answering "which metro areas are closest to LAX?" by computing the haversine distance to every record is O(n) per
+# query. SpatialIndex avoids most of those distance computations with a grid.
+
+# a grid over raw latitude and longitude has awkward corners: cells shrink towards the poles, and the antimeridian
+# (longitude 180 == -180) splits neighbors. So each point is first turned into a unit vector (x, y, z) on the sphere.
+# The straight-line (chord) distance between two unit vectors grows with the great-circle distance, so the nearest
+# points by chord are the nearest points on the earth. The 3D space is cut into cubic cells of side `cell`, and
+# a dict maps each cell index (i, j, k) to the points inside it: inserting a point is O(1).
+
+# a query visits shells of cells around the query's own cell: shell 0 is the cell itself, shell 1 the 26 cells around
+# it, and so on. Every point in shell r + 1 is at least r * cell away, so the search stops as soon as the k-th best
+# distance found so far is within that bound. With cells sized so that each holds a few points, a k-nearest query
+# touches a handful of cells no matter how many points are indexed.
+
+"""
+    >>> from tuples import lax_coordinates, metro_areas
+    >>> index = SpatialIndex.from_records(metro_areas)
+    >>> [(name, round(km)) for km, name in index.nearest(*lax_coordinates, k=2)]
+    [('Mexico City', 2496), ('New York-Newark', 3953)]
+    >>> [name for km, name in index.within(35.0, 139.0, 500)]
+    ['Tokyo']
+
+"""
+
+import heapq
+import math
+from collections import defaultdict
+from itertools import count, product
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_xyz(latitude, longitude):
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)
+
+
+# convert between kilometers along the surface and chord length on the unit sphere
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    return chord_to_km(math.dist(to_xyz(lat1, lon1), to_xyz(lat2, lon2)))
+
+
+class SpatialIndex:
+
+    # cell_km close to the typical distance between neighboring points keeps a few points per cell
+    def __init__(self, cell_km=50):
+        self._cell = km_to_chord(cell_km)
+        self._cells = defaultdict(list)
+        self._len = 0
+        self._shells = {}
+
+    @classmethod
+    def from_records(cls, records, cell_km=50):
+        index = cls(cell_km)
+        for name, cc, pop, (latitude, longitude) in records:
+            index.insert(latitude, longitude, name)
+        return index
+
+    def __len__(self):
+        return self._len
+
+    def _key(self, xyz):
+        cell = self._cell
+        return tuple(math.floor(c / cell) for c in xyz)
+
+    def insert(self, latitude, longitude, item=None):
+        xyz = to_xyz(latitude, longitude)
+        self._cells[self._key(xyz)].append((xyz, item))
+        self._len += 1
+
+    # the offsets (di, dj, dk) of the cells whose Chebyshev distance from the center is exactly r
+    def _shell(self, r):
+        shell = self._shells.get(r)
+        if shell is None:
+            steps = range(-r, r + 1)
+            shell = [offset for offset in product(steps, steps, steps) if max(map(abs, offset)) == r]
+            self._shells[r] = shell
+        return shell
+
+    # yield (r, points) shell by shell. When a shell would have more cells than there are occupied cells, the rest of
+    # the grid is scanned directly instead, and reported as one last shell
+    def _visit(self, key, max_r=None):
+        i, j, k = key
+        cells = self._cells
+        for r in count():
+            if max_r is not None and r > max_r:
+                return
+            if 24 * r * r + 2 > len(cells):
+                rest = [point for (ci, cj, ck), points in cells.items()
+                        if max(abs(ci - i), abs(cj - j), abs(ck - k)) >= r
+                        for point in points]
+                yield None, rest
+                return
+            points = []
+            for di, dj, dk in self._shell(r):
+                found = cells.get((i + di, j + dj, k + dk))
+                if found:
+                    points.extend(found)
+            yield r, points
+
+    # the k nearest items as a sorted list of (distance_km, item); empty for k <= 0, like heapq.nsmallest
+    def nearest(self, latitude, longitude, k=1):
+        if k <= 0:
+            return []
+        query = to_xyz(latitude, longitude)
+        best = []  # max-heap of the best k so far, as (-distance, tie breaker, item)
+        tie = count()
+        for r, points in self._visit(self._key(query)):
+            for xyz, item in points:
+                entry = (-math.dist(query, xyz), next(tie), item)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            if r is not None and len(best) == k and -best[0][0] <= r * self._cell:
+                break
+        return [(chord_to_km(-d), item) for d, _, item in sorted(best, reverse=True)]
+
+    # every item within radius_km, as a sorted list of (distance_km, item)
+    def within(self, latitude, longitude, radius_km):
+        query = to_xyz(latitude, longitude)
+        limit = km_to_chord(radius_km)
+        max_r = math.ceil(limit / self._cell) + 1
+        found = []
+        for r, points in self._visit(self._key(query), max_r):
+            for xyz, item in points:
+                d = math.dist(query, xyz)
+                if d <= limit:
+                    found.append((chord_to_km(d), item))
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+    # batch versions: one result list per (latitude, longitude) query point
+    def nearest_many(self, points, k=1):
+        return [self.nearest(latitude, longitude, k) for latitude, longitude in points]
+
+    def within_many(self, points, radius_km):
+        return [self.within(latitude, longitude, radius_km) for latitude, longitude in points]
+
+
+def benchmark(sizes=(10**3, 10**4, 10**5, 10**6), queries=1000, k=5):
+    import random
+    from time import perf_counter
+
+    random.seed(3)
+
+    # uniform points on the sphere: latitude from the inverse of the sine
+    def random_point():
+        return math.degrees(math.asin(random.uniform(-1, 1))), random.uniform(-180, 180)
+
+    query_points = [random_point() for i in range(queries)]
+    for n in sizes:
+        points = [random_point() for i in range(n)]
+        # about 4 points per cell on average: the surface is 4 * pi * R**2 km**2
+        cell_km = math.sqrt(4 * math.pi * EARTH_RADIUS_KM**2 / n * 4)
+        index = SpatialIndex(cell_km)
+        t0 = perf_counter()
+        for i, (latitude, longitude) in enumerate(points):
+            index.insert(latitude, longitude, i)
+        build = perf_counter() - t0
+
+        t0 = perf_counter()
+        results = index.nearest_many(query_points, k)
+        indexed = (perf_counter() - t0) / queries
+        line = f'{n:>9,} points: build {build:6.2f}s, k={k} query {indexed * 1e6:8.1f}us'
+
+        # the linear scan the index replaces, on a sample of queries
+        if n <= 10**5:
+            sample = query_points[:50]
+            t0 = perf_counter()
+            for (latitude, longitude), result in zip(sample, results):
+                scan = heapq.nsmallest(k, ((haversine(latitude, longitude, *p), i) for i, p in enumerate(points)))
+                assert [i for _, i in scan] == [i for _, i in result]
+            line += f', linear scan {(perf_counter() - t0) / len(sample) * 1e6:10.1f}us'
+        print(line)
+
+
+def main():
+    from tuples import lax_coordinates, metro_areas
+
+    index = SpatialIndex.from_records(metro_areas)
+    for km, name in index.nearest(*lax_coordinates, k=3):
+        print(f'{name:15} {km:8.1f} km')
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,4 @@
 # example from the Python Data Model chapter of Fluent Python by Luciano Ramalho
-import math
-
-# A basic vector API
-
 """
 vector2d.py: a simplistic class demonstrating some special methods
 
@@ -27,8 +23,34 @@ Scalar multiplication::
     >>> abs(v * 3)
     15.0
 
+Immutability and hashing::
+    >>> v = Vector2d(3, 4)
+    >>> v.x = 7
+    Traceback (most recent call last):
+      ...
+    AttributeError: property 'x' of 'Vector2d' object has no setter
+    >>> hash(v) == hash(Vector2d(3, 4))
+    True
+
+Only a Vector2d equals a Vector2d::
+    >>> v == Vector2d(3.0, 4.0), v == (3.0, 4.0), v == None, v in [None, 5, v]
+    (True, False, False, True)
+    >>> len({v: 1, (3.0, 4.0): 2})
+    2
+
+Binary round trip::
+    >>> bytes(v)
+    b'd\\x00\\x00\\x00\\x00\\x00\\x00\\x08@\\x00\\x00\\x00\\x00\\x00\\x00\\x10@'
+    >>> Vector2d.frombytes(bytes(v))
+    Vector2d(3.0, 4.0)
+
 """
 
+import math
+from array import array
+
+
+# A basic vector API
 class Vector:
 
     def __init__(self, x=0, y=0):
@@ -43,7 +65,7 @@ class Vector:
     # contrast with __str__, which is implicitly used by the print function. __str__ should return string
     # suitable for display to end users.
     def __repr__(self):
-        return f'Vector({self.x!r}, {self.y!r}'
+        return f'Vector({self.x!r}, {self.y!r})'
 
     def __abs__(self):
         return math.hypot(self.x, self.y)
@@ -72,4 +94,129 @@ class Vector:
 
 
 # six special methods have been implemented. These are not called directly. The Python interpreter is the only frequent
-# caller of most special methods.
\ No newline at end of file
+# caller of most special methods.
+
+
+# Vector2d is a compact, immutable variant of Vector, following the Pythonic Object chapter of Fluent Python.
+
+# __slots__ tells the interpreter to store the attributes in a fixed array in the instance instead of a per-instance
+# __dict__. With tens of millions of vectors resident, dropping the dict saves the bulk of the memory per instance.
+# The two attributes are "private" (__x, __y) and exposed through read-only properties, so instances are immutable,
+# which is what makes them safe to hash and to use as dict keys or set members.
+class Vector2d:
+    # the typecode is used to convert instances to and from bytes, and is shared with dump_vectors/load_vectors
+    typecode = 'd'
+    __slots__ = ('__x', '__y')
+
+    def __init__(self, x=0, y=0):
+        self.__x = float(x)
+        self.__y = float(y)
+
+    @property
+    def x(self):
+        return self.__x
+
+    @property
+    def y(self):
+        return self.__y
+
+    # iterating makes unpacking work: x, y = v
+    def __iter__(self):
+        return iter((self.__x, self.__y))
+
+    def __repr__(self):
+        class_name = type(self).__name__
+        return '{}({!r}, {!r})'.format(class_name, *self)
+
+    def __str__(self):
+        return str(tuple(self))
+
+    # the first byte is the typecode, followed by the packed machine values of x and y
+    def __bytes__(self):
+        return bytes([ord(self.typecode)]) + bytes(array(self.typecode, self))
+
+    # only another Vector2d can be equal: comparing as tuples would make Vector2d(3, 4) == (3.0, 4.0) with the same
+    # hash, so the two would collide as dict keys, and would raise TypeError for None or a number. NotImplemented
+    # lets Python try the other operand, then fall back to identity
+    def __eq__(self, other):
+        if not isinstance(other, Vector2d):
+            return NotImplemented
+        return self.__x == other.x and self.__y == other.y
+
+    def __hash__(self):
+        return hash((self.__x, self.__y))
+
+    def __abs__(self):
+        return math.hypot(self.__x, self.__y)
+
+    def __bool__(self):
+        return bool(abs(self))
+
+    def __add__(self, other):
+        return type(self)(self.__x + other.x, self.__y + other.y)
+
+    def __mul__(self, scalar):
+        return type(self)(self.__x * scalar, self.__y * scalar)
+
+    # an alternative constructor that reads back what __bytes__ wrote
+    @classmethod
+    def frombytes(cls, octets):
+        typecode = chr(octets[0])
+        memv = memoryview(octets[1:]).cast(typecode)
+        return cls(*memv)
+
+
+# bulk persistence: write every x and y as one flat run of packed doubles with array.tofile, the same technique
+# arrays.py uses for 10 million floats. No per-vector header, so the file is exactly 16 bytes per vector.
+def dump_vectors(vectors, fp):
+    floats = array(Vector2d.typecode)
+    for v in vectors:
+        floats.extend(v)
+    floats.tofile(fp)
+    return len(floats) // 2
+
+
+# read back count vectors (or the whole file when count is None) written by dump_vectors
+def load_vectors(fp, count=None):
+    floats = array(Vector2d.typecode)
+    if count is None:
+        floats.frombytes(fp.read())
+    else:
+        floats.fromfile(fp, count * 2)
+    it = iter(floats)
+    # zip of the same iterator twice pairs consecutive values: (x0, y0), (x1, y1), ...
+    return [Vector2d(x, y) for x, y in zip(it, it)]
+
+
+def memory_report(n=10**5):
+    import sys
+    import tracemalloc
+
+    print(f'sys.getsizeof(Vector(1, 2)) = {sys.getsizeof(Vector(1, 2))} '
+          f'+ __dict__ {sys.getsizeof(Vector(1, 2).__dict__)}')
+    print(f'sys.getsizeof(Vector2d(1, 2)) = {sys.getsizeof(Vector2d(1, 2))} (no __dict__)')
+
+    # tracemalloc counts every block allocated while building the list, including the float objects
+    for cls in (Vector, Vector2d):
+        tracemalloc.start()
+        vectors = [cls(float(i), float(i)) for i in range(n)]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'{n:,} {cls.__name__} instances: {current / n:.1f} bytes per vector')
+        del vectors
+
+
+def main():
+    import io
+
+    vectors = [Vector2d(3, 4), Vector2d(1.5, -2)]
+    print(vectors, {v: abs(v) for v in vectors})
+    buffer = io.BytesIO()
+    dump_vectors(vectors, buffer)
+    buffer.seek(0)
+    print(load_vectors(buffer) == vectors)
+    memory_report()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# a structure-of-arrays companion to the Vector class in vector2d.py
+"""
+vector_array.py: many 2D vectors stored as two columns of packed doubles
+
+Every Vector + Vector or Vector * scalar allocates a brand new Python object. When millions of vectors are updated
+at once, that object churn dominates the run time. VectorArray keeps all the x values in one array('d') and all the
+y values in another, so an operation over the whole batch is a single pass of map() over packed doubles, and no
+Vector instance is built unless you index into the batch.
+
+Addition::
+    >>> va = VectorArray([Vector(2, 4), Vector(3, 4)])
+    >>> total = va + VectorArray([Vector(2, 1), Vector(1, 1)])
+    >>> total.xs.tolist(), total.ys.tolist()
+    ([4.0, 4.0], [5.0, 5.0])
+
+Absolute value and truthiness, one value per vector::
+    >>> abs(va).tolist()
+    [4.47213595499958, 5.0]
+    >>> VectorArray([Vector(0, 0), Vector(1, 0)]).mask().tolist()
+    [0, 1]
+
+Indexing returns a plain Vector::
+    >>> v = (va * 3)[1]
+    >>> type(v).__name__, v.x, v.y
+    ('Vector', 9.0, 12.0)
+    >>> abs(va * 3)[1]
+    15.0
+
+"""
+
+import math
+import operator
+from array import array
+from itertools import repeat
+
+from vector2d import Vector
+
+
+class VectorArray:
+
+    typecode = 'd'
+
+    def __init__(self, vectors=()):
+        # build the two columns from any iterable of Vector, without keeping the Vector objects around
+        self.xs = array(self.typecode)
+        self.ys = array(self.typecode)
+        for v in vectors:
+            self.xs.append(v.x)
+            self.ys.append(v.y)
+
+    # alternative constructor: adopt two existing columns, i.e. from array.fromfile or another VectorArray
+    @classmethod
+    def fromcolumns(cls, xs, ys):
+        va = cls()
+        va.xs = array(cls.typecode, xs)
+        va.ys = array(cls.typecode, ys)
+        if len(va.xs) != len(va.ys):
+            raise ValueError('x and y columns must have the same length')
+        return va
+
+    def __len__(self):
+        return len(self.xs)
+
+    # integer indexes build a single Vector on demand. Slices return a new VectorArray, like list slicing returns a list
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return type(self).fromcolumns(self.xs[index], self.ys[index])
+        return Vector(self.xs[index], self.ys[index])
+
+    def __setitem__(self, index, vector):
+        self.xs[index] = vector.x
+        self.ys[index] = vector.y
+
+    def __iter__(self):
+        return map(Vector, self.xs, self.ys)
+
+    def __repr__(self):
+        return f'VectorArray({list(self)!r})'
+
+    def __eq__(self, other):
+        if isinstance(other, VectorArray):
+            return self.xs == other.xs and self.ys == other.ys
+        return NotImplemented
+
+    def append(self, vector):
+        self.xs.append(vector.x)
+        self.ys.append(vector.y)
+
+    # map() over two arrays runs the loop in C and never creates intermediate Vector instances
+    def __add__(self, other):
+        if not isinstance(other, VectorArray):
+            return NotImplemented
+        if len(self) != len(other):
+            raise ValueError('VectorArray operands must have the same length')
+        return type(self).fromcolumns(map(operator.add, self.xs, other.xs),
+                                      map(operator.add, self.ys, other.ys))
+
+    def __mul__(self, scalar):
+        if isinstance(scalar, VectorArray):
+            return NotImplemented
+        return type(self).fromcolumns(map(operator.mul, self.xs, repeat(scalar)),
+                                      map(operator.mul, self.ys, repeat(scalar)))
+
+    # 3 * va works as well as va * 3
+    __rmul__ = __mul__
+
+    # abs of a batch is the batch of magnitudes, the same math.hypot that Vector.__abs__ uses
+    def __abs__(self):
+        return array(self.typecode, map(math.hypot, self.xs, self.ys))
+
+    # __bool__ must return a single bool, so it keeps the container meaning (empty or not).
+    # mask() gives the per-vector truthiness that Vector.__bool__ computes, as an array of 0/1 bytes
+    def __bool__(self):
+        return len(self) > 0
+
+    def mask(self):
+        return array('B', map(bool, map(math.hypot, self.xs, self.ys)))
+
+    # dot product of each pair of vectors in two batches of the same length
+    def dot(self, other):
+        if len(self) != len(other):
+            raise ValueError('VectorArray operands must have the same length')
+        return array(self.typecode, map(operator.add,
+                                        map(operator.mul, self.xs, other.xs),
+                                        map(operator.mul, self.ys, other.ys)))
+
+
+def benchmark(n=10**6):
+    from random import random
+    from time import perf_counter
+
+    vectors = [Vector(random(), random()) for i in range(n)]
+    others = [Vector(random(), random()) for i in range(n)]
+
+    # the list-of-Vector baseline creates two new objects per item: one for + and one for *
+    t0 = perf_counter()
+    moved = [(v + w) * 0.5 for v, w in zip(vectors, others)]
+    lengths = [abs(v) for v in moved]
+    loop_time = perf_counter() - t0
+
+    va, wa = VectorArray(vectors), VectorArray(others)
+    t0 = perf_counter()
+    moved_array = (va + wa) * 0.5
+    lengths_array = abs(moved_array)
+    array_time = perf_counter() - t0
+
+    assert lengths_array.tolist() == lengths
+    print(f'{n:,} vectors')
+    print(f'list of Vector: {loop_time:.3f}s')
+    print(f'VectorArray:    {array_time:.3f}s ({loop_time / array_time:.1f}x)')
+
+
+def main():
+    va = VectorArray([Vector(2, 4), Vector(3, 4), Vector(0, 0)])
+    print(va)
+    print(va + va)
+    print(va * 3)
+    print(abs(va))
+    print(va.mask())
+    print(va.dot(va))
+    benchmark()
+
+
+if __name__ == '__main__':
+    main()